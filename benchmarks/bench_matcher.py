@@ -0,0 +1,89 @@
+"""
+Benchmarks the compiled KeywordMatcher against the naive rule loop it
+replaced, across a range of file and rule counts.
+
+Run from the project root:
+    python -m benchmarks.bench_matcher
+"""
+
+import random
+import string
+import time
+from typing import List, Dict, Any
+
+from src.core.matcher import KeywordMatcher
+
+FILE_COUNTS = [1_000, 10_000, 50_000]
+RULE_COUNTS = [10, 1_000, 5_000]
+
+
+def naive_target_groups(rule_mapping: List[Dict[str, Any]], filename: str) -> List[str] | None:
+    """The original per-file, per-rule, per-keyword loop."""
+    file_was_matched = False
+    groups = []
+    name_lower = filename.lower()
+    for rule in rule_mapping:
+        if any(keyword.lower() in name_lower for keyword in rule.get("keywords", [])):
+            file_was_matched = True
+            groups.extend(rule.get("target_groups", []))
+    return groups if file_was_matched else None
+
+
+def _random_word(rng: random.Random, length: int) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=length))
+
+
+def make_rules(rule_count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    return [
+        {
+            "keywords": [_random_word(rng, rng.randint(4, 9)) for _ in range(rng.randint(1, 3))],
+            "target_groups": [f"group_{i % 50}"],
+        }
+        for i in range(rule_count)
+    ]
+
+
+def make_filenames(file_count: int, rules: List[Dict[str, Any]], rng: random.Random) -> List[str]:
+    keywords = [k for rule in rules for k in rule["keywords"]]
+    names = []
+    for i in range(file_count):
+        parts = [_random_word(rng, 6), str(i)]
+        if rng.random() < 0.7:
+            parts.insert(1, rng.choice(keywords).upper())
+        names.append("_".join(parts) + ".pdf")
+    return names
+
+
+def run():
+    rng = random.Random(42)
+    print(f"{'rules':>7} {'files':>8} {'naive (s)':>11} {'compiled (s)':>13} {'build (s)':>10} {'speedup':>8}")
+    for rule_count in RULE_COUNTS:
+        rules = make_rules(rule_count, rng)
+        build_start = time.perf_counter()
+        matcher = KeywordMatcher(rules)
+        build_time = time.perf_counter() - build_start
+
+        for file_count in FILE_COUNTS:
+            names = make_filenames(file_count, rules, rng)
+
+            # The naive loop is quadratic; sample it for the large cases.
+            sample = names[: max(1, min(file_count, 2_000_000 // rule_count))]
+            start = time.perf_counter()
+            naive_results = [naive_target_groups(rules, name) for name in sample]
+            naive_time = (time.perf_counter() - start) * len(names) / len(sample)
+
+            start = time.perf_counter()
+            compiled_results = [matcher.target_groups(name) for name in names]
+            compiled_time = time.perf_counter() - start
+
+            if compiled_results[: len(sample)] != naive_results:
+                raise AssertionError("Compiled matcher disagrees with the naive loop.")
+
+            print(
+                f"{rule_count:>7} {file_count:>8} {naive_time:>11.3f} {compiled_time:>13.3f} "
+                f"{build_time:>10.3f} {naive_time / compiled_time:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,162 @@
+"""
+Benchmarks the planning path (reading the rule CSV, building the queue and
+sorting it) on synthetic workspaces and rule sets, and catches regressions
+against a saved baseline.
+
+For each case the fastest of `--repeat` runs is reported, plus the peak
+memory of one extra run under tracemalloc. The matcher is built before
+get_processed_queue is timed, as it is once per run in production.
+
+Run from the project root:
+    python -m benchmarks.bench_planning --output baseline.json
+    python -m benchmarks.bench_planning --baseline baseline.json      # exits with 1 on a regression
+    python -m benchmarks.bench_planning --files 1000000 --rules 50000 --sparse
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from benchmarks.corpus import COMPLETE_MARKER, make_workspace, rule_csv_path, workspace_dir, write_rule_csv
+from csv_rule_mapper import read_rule_csv
+from src.core.dispatcher import DispatcherController
+from src.core.rule_store import RuleStore
+from src.core.sorter import FileSorter
+
+FILE_COUNTS = [10, 10_000, 100_000]
+RULE_COUNTS = [10, 1_000, 50_000]
+# --full adds the largest workspace (slow to generate the first time).
+FULL_FILE_COUNTS = FILE_COUNTS + [1_000_000]
+CORPUS_DIR = Path(__file__).parent / ".corpus"
+# A case regresses if it gets this much slower or bigger than the baseline...
+DEFAULT_THRESHOLD = 0.2
+# ...and the difference is larger than timer and allocator noise.
+MIN_SECONDS_DELTA = 0.005
+MIN_BYTES_DELTA = 64 * 1024
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Times `func` (best and median of `repeat` runs) and measures its peak memory in one more run."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(durations), "median_seconds": statistics.median(durations), "peak_bytes": peak_bytes}
+
+
+def run_cases(
+    file_counts: List[int], rule_counts: List[int], repeat: int, corpus_dir: Path, seed: int, sparse: bool
+) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+
+    def report(case: str, result: Dict[str, float]):
+        results[case] = result
+        print(
+            f"{case:<46} {result['seconds']:>10.4f} {result['median_seconds']:>10.4f} "
+            f"{result['peak_bytes'] / 1_048_576:>10.1f}"
+        )
+
+    print(f"{'case':<46} {'best (s)':>10} {'median (s)':>10} {'peak (MB)':>10}")
+    rule_sets = {}
+    for rule_count in rule_counts:
+        csv_path = rule_csv_path(corpus_dir, rule_count, seed)
+        if not csv_path.exists():
+            write_rule_csv(csv_path, rule_count, seed)
+        report(f"read_rule_csv[rules={rule_count}]", measure(lambda: read_rule_csv(csv_path), repeat))
+        rule_sets[rule_count] = read_rule_csv(csv_path)
+
+    for file_count in file_counts:
+        folder = workspace_dir(corpus_dir, file_count, seed, sparse)
+        if not (folder / COMPLETE_MARKER).exists():
+            print(f"Generating {file_count} file(s) in '{folder}'...")
+        make_workspace(folder, file_count, seed, sparse)
+        for rule_count, rules in rule_sets.items():
+            dispatcher = DispatcherController(rule_store=RuleStore(rules=rules))
+            dispatcher.matcher  # Build the matcher outside the timed runs.
+            params = f"files={file_count},rules={rule_count}"
+            report(
+                f"get_processed_queue[{params}]", measure(lambda: dispatcher.get_processed_queue(folder), repeat)
+            )
+            queue, _ = dispatcher.get_processed_queue(folder)
+            report(f"sort_by_size[{params}]", measure(lambda: FileSorter().sort_by_size(queue), repeat))
+            results[f"sort_by_size[{params}]"]["items"] = len(queue)
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Prints each case against the baseline and returns the regressions found."""
+    regressions = []
+    print(f"\n{'case':<46} {'time':>16} {'peak memory':>16}")
+    for case, result in results.items():
+        old = baseline.get(case)
+        if old is None:
+            continue
+        time_ratio = result["seconds"] / old["seconds"] if old["seconds"] else 1.0
+        memory_ratio = result["peak_bytes"] / old["peak_bytes"] if old["peak_bytes"] else 1.0
+        slower = time_ratio > 1 + threshold and result["seconds"] - old["seconds"] > MIN_SECONDS_DELTA
+        bigger = memory_ratio > 1 + threshold and result["peak_bytes"] - old["peak_bytes"] > MIN_BYTES_DELTA
+        flag = "  <-- regression" if slower or bigger else ""
+        print(f"{case:<46} {time_ratio:>15.2f}x {memory_ratio:>15.2f}x{flag}")
+        if slower:
+            regressions.append(f"{case}: {old['seconds']:.4f}s -> {result['seconds']:.4f}s")
+        if bigger:
+            regressions.append(f"{case}: peak {old['peak_bytes']} -> {result['peak_bytes']} bytes")
+    return regressions
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark the planning path on synthetic workspaces.")
+    parser.add_argument("--files", type=int, nargs="+", help=f"Workspace sizes (default: {FILE_COUNTS}).")
+    parser.add_argument("--rules", type=int, nargs="+", default=RULE_COUNTS, help="Rule set sizes.")
+    parser.add_argument("--full", action="store_true", help="Include the 1,000,000-file workspace.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case.")
+    parser.add_argument("--sparse", action="store_true", help="Give the files realistic (sparse) sizes.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus-dir", type=Path, default=CORPUS_DIR, help="Where generated corpora are kept.")
+    parser.add_argument("--output", type=Path, help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", type=Path, help="Compare against results saved with --output.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown (0.2 = 20%%).")
+    return parser.parse_args()
+
+
+def run():
+    args = parse_arguments()
+    file_counts = args.files or (FULL_FILE_COUNTS if args.full else FILE_COUNTS)
+    results = run_cases(file_counts, args.rules, max(1, args.repeat), args.corpus_dir, args.seed, args.sparse)
+
+    if args.output:
+        meta = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "sparse": args.sparse,
+        }
+        args.output.write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+        print(f"\nResults written to '{args.output}'.")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against '{args.baseline}':", *regressions, sep="\n  - ")
+            sys.exit(1)
+        print(f"\nNo regressions against '{args.baseline}'.")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,103 @@
+"""
+Generates synthetic workspaces and rule CSVs for the planning benchmarks.
+
+Keywords come from one deterministic vocabulary, so a workspace can be
+matched against rule sets of any size: small rule sets match few files,
+large ones most. Generated workspaces are kept (with a completion marker),
+so a million-file corpus is only written once.
+"""
+
+import csv
+import math
+import random
+from pathlib import Path
+from typing import List
+
+SYLLABLES = [
+    "ka", "no", "la", "gos", "be", "nin", "ra", "ta", "mi", "so", "ku", "de", "ri", "van", "to",
+    "ma", "lu", "zen", "pe", "ol", "si", "ga", "ber", "fa", "ti", "mo", "wen", "da", "chi", "ro",
+]
+DOCUMENTS = ["Invoice", "Statement", "Report", "Payslip", "Delivery Note", "Audit", "Summary", "Receipt"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+# Keywords that appear in file names are drawn from this many vocabulary words.
+FILE_KEYWORD_POOL = 2_000
+# Share of files whose name contains no keyword, and of files that are not PDFs.
+UNMATCHED_SHARE = 0.2
+NON_PDF_SHARE = 0.05
+COMPLETE_MARKER = ".complete"
+
+
+def vocabulary(size: int, seed: int = 0) -> List[str]:
+    """The first `size` words of a deterministic list of unique, name-like keywords."""
+    rng = random.Random(seed)
+    words, seen = [], set()
+    while len(words) < size:
+        word = "".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))).capitalize()
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def write_rule_csv(path: Path, rule_count: int, seed: int = 0) -> Path:
+    """Writes a rule CSV with `rule_count` rules of 1-3 keywords each, some with a priority."""
+    rng = random.Random(seed)
+    words = vocabulary(rule_count * 2, seed)
+    group_count = max(1, rule_count // 10)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        writer.writerow(["keywords", "target_groups", "priority"])
+        for index in range(rule_count):
+            keywords = [words[(index * 2 + offset) % len(words)] for offset in range(rng.randint(1, 3))]
+            groups = {f"Team {rng.randrange(group_count):04d}" for _ in range(rng.randint(1, 2))}
+            priority = str(rng.randint(1, 5)) if rng.random() < 0.1 else ""
+            writer.writerow([";".join(keywords), ";".join(sorted(groups)), priority])
+    return path
+
+
+def _file_name(rng: random.Random, index: int, keywords: List[str]) -> str:
+    """A realistic report file name; most contain a keyword, in varying case and position."""
+    if rng.random() < UNMATCHED_SHARE:
+        return f"scan_{index:07d}.pdf"
+    keyword = rng.choice(keywords)
+    document = rng.choice(DOCUMENTS)
+    year = rng.randint(2019, 2025)
+    style = rng.randrange(3)
+    if style == 0:
+        name = f"{document} {keyword} {rng.choice(MONTHS)} {year} ({index}).pdf"
+    elif style == 1:
+        name = f"{document.lower().replace(' ', '_')}_{keyword.lower()}_{year}-{rng.randint(1, 12):02d}_{index:07d}.pdf"
+    else:
+        name = f"{keyword.upper()}-{document.replace(' ', '')}-{index:07d}.PDF"
+    return name if rng.random() >= NON_PDF_SHARE else name.rsplit(".", 1)[0] + ".docx"
+
+
+def make_workspace(directory: Path, file_count: int, seed: int = 0, sparse: bool = False) -> Path:
+    """
+    Fills `directory` with `file_count` files named like real reports.
+    Files are empty, or sparse (a realistic size without using disk space)
+    if `sparse` is set. An existing complete workspace is reused.
+    """
+    marker = directory / COMPLETE_MARKER
+    if marker.exists():
+        return directory
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    keywords = vocabulary(FILE_KEYWORD_POOL, seed)
+    for index in range(file_count):
+        with open(directory / _file_name(rng, index, keywords), "wb") as f:
+            if sparse:
+                f.truncate(min(20_000_000, int(rng.lognormvariate(math.log(250_000), 1.0))))
+    marker.touch()
+    return directory
+
+
+def workspace_dir(root: Path, file_count: int, seed: int = 0, sparse: bool = False) -> Path:
+    """Where the workspace for these parameters is kept under `root`."""
+    return root / f"files-{file_count}-seed{seed}{'-sparse' if sparse else ''}"
+
+
+def rule_csv_path(root: Path, rule_count: int, seed: int = 0) -> Path:
+    return root / f"rules-{rule_count}-seed{seed}.csv"
+
@@ -1,15 +1,19 @@
 from pathlib import Path
-from csv_rule_mapper import mapping_rules
+
+PROJECT_DIR = Path(__file__).resolve().parent
 
 # The directory where the script will look for folders containing PDFs.
 home_directory = Path.home()
 DEFAULT_WORKSPACE = home_directory / "Desktop"
 
 # Maps keywords to a LIST of target groups.
-# CSV defined rules
-RULE_MAPPING = mapping_rules
+# CSV defined rules: loaded on first use (not at import), compiled once and
+# cached in RULE_CACHE_PATH. Watch and daemon modes reload them when the CSV changes.
+RULE_CSV_PATH = PROJECT_DIR / "rule_mapping.csv"
+RULE_CACHE_PATH = PROJECT_DIR / ".rule_mapping.cache"
+RULE_MAPPING = None  # None = use the CSV rules
 
-# Manually define rules here
+# Manually define rules here (instead of the CSV)
 # RULE_MAPPING = [
 #     {
 #         "keywords": ["system", "dynamical"],
@@ -21,15 +25,106 @@ RULE_MAPPING = mapping_rules
 #     },
 # ]
 
+# --- Batch Mode Settings ---
+# Number of threads used to scan folders in parallel in batch mode.
+BATCH_SCAN_WORKERS = 8
+
+# --- Send Ledger ---
+# SQLite record of delivered (file content, group) pairs. Re-running a folder
+# skips anything already sent, so interrupted runs resume where they stopped.
+# State files live in the project folder, so runs started from any working
+# directory (e.g. cron) share them.
+USE_SEND_LEDGER = True
+SEND_LEDGER_PATH = PROJECT_DIR / "send_ledger.sqlite3"
+
+# --- Send History ---
+# How long each upload took, used to estimate (and show) the time a plan
+# will take. The model improves as more sends are recorded.
+RECORD_SEND_HISTORY = True
+SEND_HISTORY_PATH = PROJECT_DIR / "send_history.sqlite3"
+
+# --- Watch Mode Settings ---
+# A new PDF is queued once its size and mtime are unchanged for this long.
+WATCH_SETTLE_SECONDS = 5
+# Files settling within this window are sent together (each chat visited once).
+WATCH_COALESCE_SECONDS = 30
+# Polling interval used when the optional `watchdog` package is not installed.
+WATCH_POLL_SECONDS = 2
+
+# --- PDF Optimization (optional, needs `pip install pikepdf`) ---
+# Losslessly shrink PDFs into a cache before upload. Files saving less than
+# PDF_MIN_SAVING_RATIO (e.g. 0.05 = 5%) are sent unchanged.
+OPTIMIZE_PDFS = False
+PDF_CACHE_DIR = PROJECT_DIR / "optimized_pdf_cache"
+PDF_MIN_SAVING_RATIO = 0.05
+PDF_OPTIMIZE_WORKERS = None  # None = one worker per CPU
+
+# --- Timing Metrics ---
+# When on (or with --metrics), a run writes its phase timings (one JSON object
+# per line) to a new file in METRICS_DIR and prints a p50/p95 summary per
+# phase and group at the end.
+RECORD_METRICS = False
+METRICS_DIR = PROJECT_DIR / "metrics"
+
+# --- Daemon Mode Settings ---
+# Unix domain socket the distributor daemon listens on for jobs.
+DAEMON_SOCKET_PATH = home_directory / ".whatsapp_distributor.sock"
+
+# --- Scheduling ---
+# Send order: "grouped" (each chat once, small files first), "size",
+# "shortest-upload", "round-robin" (fair turns across groups) or "priority"
+# (by the optional `priority` column of rule_mapping.csv, higher first).
+SCHEDULE = "grouped"
+
 # --- Sending Engine Settings ---
 DEFAULT_STAGGER_MINUTES = 0.08
 
+# --- Sharded Sending ---
+# Number of sender processes. Each has its own browser profile
+# (USER_DATA_DIR, then USER_DATA_DIR + "_shard1", ...), which can be logged
+# in to its own account, and always serves the same groups.
+SENDER_SHARDS = 1
+# How many different accounts the shard profiles are logged in to (shard n
+# uses account n % SHARD_ACCOUNTS). The rate limits below apply per account,
+# so shards sharing an account share them. 1 = all shards use one account.
+SHARD_ACCOUNTS = 1
+
+# --- Rate Limiting ---
+# A token bucket paces uploads; time spent searching and uploading counts
+# toward the interval. The sustained rate defaults to one upload per
+# DEFAULT_STAGGER_MINUTES, and BURST uploads may go out back-to-back.
+# A stagger of 0 (or None) means no global limit.
+RATE_LIMIT_PER_MINUTE = 1 / DEFAULT_STAGGER_MINUTES if DEFAULT_STAGGER_MINUTES else None
+RATE_LIMIT_BURST = 1
+# Optional extra limit applied to each group separately (None to disable).
+GROUP_RATE_LIMIT_PER_MINUTE = None
+GROUP_RATE_LIMIT_BURST = 1
+# Maximum number of files attached to one chat in a single upload action.
+# Set to 1 to send every file on its own.
+MAX_FILES_PER_UPLOAD = 10
+
+# --- Logging ---
+# Records are written by a background thread to a size-rotated log file.
+LOG_FILE = PROJECT_DIR / "whatsapp_distributor.log"
+LOG_LEVEL = "INFO"  # "DEBUG" logs every browser step (or pass --debug)
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+LOG_JSON = False  # True writes one JSON object per line
+
 # --- Message Content ---
 MESSAGE_CAPTION = "Here is the report you requested."
 
 # --- Browser Backend Settings ---
+# Select the backend for sending WhatsApp messages.
+# Options: "selenium", "playwright", "playwright-async"
+WHATSAPP_BACKEND = "selenium"
 USER_DATA_DIR = "selenium_user_data"
 HEADLESS_MODE = False  # Set to True to run browser in headless mode
+# Pacing on top of the condition-based waits in the browser backends:
+# "fast" moves on as soon as the page is ready, "human" adds human-like pauses.
+LATENCY_PROFILE = "fast"
+# How long to wait for WhatsApp Web to be logged in (saved session or QR scan).
+LOGIN_TIMEOUT_SECONDS = 120
 
 # --- Backend Selectors (Simplified) ---
 SELECTORS = {
@@ -39,11 +134,15 @@ SELECTORS = {
         "xpath",
         '//*[@id="pane-side"]/div[1]/div/div/div[2]/div/div/div/div[2]',
     ),
+    # Header of the open chat (used to confirm the right chat was opened).
+    "chat_header": ("css", "#main header"),
     "attach_button": (
         "xpath",
         '//*[@id="main"]/footer/div[1]/div/span/div/div[2]/div/div[1]/div/span/div/div/div[1]/div[1]/span',
     ),
     "file_input": ("css", "input[accept*='*'][type='file']"),
+    # Shown on an outgoing message until its upload has reached the server.
+    "pending_message": ("css", "#main span[data-icon='msg-time']"),
     "caption_box": (
         "css",
         "div[data-testid='caption-input-container'] div[data-testid='caption-input']",
@@ -60,3 +159,39 @@ SELECTORS = {
     # ),
 }
 
+
+# --- Playwright Selectors ---
+# Candidate selectors for each element, tried in order by the Playwright
+# backends. "{name}" is replaced by the group name.
+PLAYWRIGHT_SELECTORS = {
+    "login_check": ["#pane-side", "div[aria-label='Chat list']"],
+    "search_box": [
+        "#side div[contenteditable='true']",
+        "div[contenteditable='true'][data-tab='3']",
+    ],
+    "search_result_by_name": ["#pane-side span[title='{name}']", "span[title='{name}']"],
+    "chat_header_title": ["#main header span[dir='auto']", "#main header span[title]"],
+    "attach_button": [
+        "span[data-icon='plus-rounded']",
+        "span[data-icon='plus']",
+        "span[data-icon='attach-menu-plus']",
+        "span[data-icon='clip']",
+    ],
+    "document_button": ["li:has(span[data-icon='document'])", "span[data-icon='document']"],
+    "caption_box": [
+        "div[aria-label='Add a caption'][contenteditable='true']",
+        "div[data-testid='caption-input-container'] div[contenteditable='true']",
+    ],
+    "send_button": ["div[aria-label='Send']", "span[data-icon='send']"],
+    # Shown on an outgoing message until its upload has reached the server.
+    "pending_message": ["#main span[data-icon='msg-time']"],
+}
+
+# Where the Playwright backends remember which candidate selector works.
+SELECTOR_CACHE_PATH = PROJECT_DIR / "selector_cache.json"
+
+# How long to wait for an upload to leave the pending (clock) state.
+UPLOAD_CONFIRM_TIMEOUT_SECONDS = 300
+# How long after a send its pending indicator may take to appear. An upload
+# whose indicator was never seen only counts as done after this long.
+UPLOAD_INDICATOR_GRACE_SECONDS = 3
@@ -1,17 +1,41 @@
 import csv
+import logging
+
+REQUIRED_COLUMNS = ("keywords", "target_groups")
+
 
 def read_rule_csv(csv_path):
+    """
+    Parses and validates a rule CSV. Raises ValueError if a required column
+    is missing; rules without target groups are skipped with a warning.
+    """
     rules = []
-    with open(csv_path, 'r') as f:
+    with open(csv_path, 'r', newline='', encoding='utf-8') as f:
         reader = csv.DictReader(f)
+        missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Rule CSV '{csv_path}' is missing column(s): {', '.join(missing)}")
         for row in reader:
+            if None in row:
+                raise ValueError(f"Rule CSV '{csv_path}', line {reader.line_num}: more fields than columns.")
             rule = {}
             for key, value in row.items():
                 # Split by ';' and strip whitespace
-                rule[key] = [v.strip() for v in value.split(';') if v.strip()]
+                rule[key] = [v.strip() for v in (value or '').split(';') if v.strip()]
+            if not rule["target_groups"]:
+                logging.warning(f"Rule CSV '{csv_path}', line {reader.line_num}: no target groups given, skipping the rule.")
+                continue
+            # Optional column: a whole number, higher is sent first (see the "priority" schedule).
+            if rule.get("priority") and (len(rule["priority"]) > 1 or not rule["priority"][0].lstrip("-").isdigit()):
+                raise ValueError(f"Rule CSV '{csv_path}', line {reader.line_num}: priority must be a whole number.")
             rules.append(rule)
     return rules
 
 
-mapping_rules = read_rule_csv('rule_mapping.csv')
-# print(mapping_rules)
+def __getattr__(name):
+    # `mapping_rules` used to be parsed at import time; it is now loaded on first use.
+    if name == "mapping_rules":
+        from src.core.rule_store import RuleStore
+
+        return RuleStore.from_config().rules
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,59 +1,354 @@
+import argparse
+import asyncio
 import logging
-from config import RULE_MAPPING, DEFAULT_WORKSPACE
+import time
+from pathlib import Path
+from config import (
+    DEFAULT_WORKSPACE,
+    BATCH_SCAN_WORKERS,
+    WHATSAPP_BACKEND,
+    DAEMON_SOCKET_PATH,
+    USE_SEND_LEDGER,
+    SEND_LEDGER_PATH,
+    WATCH_SETTLE_SECONDS,
+    WATCH_COALESCE_SECONDS,
+    WATCH_POLL_SECONDS,
+    OPTIMIZE_PDFS,
+    PDF_CACHE_DIR,
+    PDF_MIN_SAVING_RATIO,
+    PDF_OPTIMIZE_WORKERS,
+    RECORD_METRICS,
+    METRICS_DIR,
+    LOG_LEVEL,
+    SENDER_SHARDS,
+    SHARD_ACCOUNTS,
+    SCHEDULE,
+    MAX_FILES_PER_UPLOAD,
+    RATE_LIMIT_PER_MINUTE,
+    RECORD_SEND_HISTORY,
+    SEND_HISTORY_PATH,
+    USER_DATA_DIR,
+)
 from src.core.file_handler import FolderReader
 from src.core.dispatcher import DispatcherController
 from src.core.sorter import FileSorter
+from src.core.scheduling import STRATEGIES, create_strategy
 from src.core.sender import WhatsAppFileSender
+from src.core.sharding import ShardedSender, shard_profile_dirs
+from src.core.daemon import DistributorDaemon, submit_job
+from src.core.ledger import SendLedger
+from src.core.history import SendHistory, ThroughputModel, format_duration
+from src.core.rule_store import RuleStore
+from src.core.watcher import FolderWatcher
+from src.core.optimizer import PdfOptimizer
+from src.core.sender_backends.registry import available_backends
 from src.utils.logger import setup_logging
+from src.utils.metrics import metrics, log_summary
 
-def main():
-    """Main entry point for the application."""
-    setup_logging()
-    logging.info("--- WhatsApp PDF Distributor v4.0 ---")
 
-    # --- PHASE 1: PREPARATION (Console only) ---
-    folder_reader = FolderReader(workspace_path=DEFAULT_WORKSPACE)
-    dispatcher = DispatcherController(rule_mapping=RULE_MAPPING)
-    sorter = FileSorter()
+def parse_args():
+    """Parses command-line options. With no options the interactive flow runs."""
+    parser = argparse.ArgumentParser(description="WhatsApp PDF Distributor")
+    parser.add_argument(
+        "--backend", choices=available_backends(), default=WHATSAPP_BACKEND,
+        help="Browser backend used to send files (default: %(default)s).",
+    )
+    batch = parser.add_argument_group(
+        "batch mode", "Process several folders in one browser session, without any prompts."
+    )
+    batch.add_argument(
+        "--folders", nargs="+", metavar="FOLDER",
+        help="Folders to process (relative paths are looked up in the workspace).",
+    )
+    batch.add_argument("--glob", metavar="PATTERN", help="Glob of workspace folders to process, e.g. 'reports_*'.")
+    batch.add_argument("--recursive", action="store_true", help="Process every folder beneath the workspace.")
+    batch.add_argument("--workspace", default=DEFAULT_WORKSPACE, help="Workspace directory (default: %(default)s).")
+    batch.add_argument(
+        "--workers", type=int, default=BATCH_SCAN_WORKERS,
+        help="Threads used to scan folders in parallel (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--resend", action="store_true",
+        help="Send files again even if the send ledger says they were already delivered.",
+    )
+    parser.add_argument(
+        "--watch", nargs="*", metavar="FOLDER",
+        help="Watch folders (default: the workspace) and send new PDFs as they arrive.",
+    )
+    parser.add_argument(
+        "--schedule", choices=list(STRATEGIES), default=SCHEDULE,
+        help="Order in which files are sent (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--shards", type=int, default=SENDER_SHARDS,
+        help="Send with this many browser processes, each with its own profile (default: %(default)s).",
+    )
+    parser.add_argument("--debug", action="store_true", help="Log every browser step (DEBUG level).")
+    parser.add_argument(
+        "--metrics", action="store_true", default=RECORD_METRICS,
+        help=f"Record phase timings in '{METRICS_DIR}' and print a summary at the end.",
+    )
+    daemon = parser.add_argument_group(
+        "daemon mode", "Keep a logged-in browser running and send jobs to it over a local socket."
+    )
+    daemon.add_argument("--daemon", action="store_true", help="Run the distributor daemon.")
+    daemon.add_argument("--submit", metavar="FOLDER", help="Submit FOLDER to the running daemon and show progress.")
+    daemon.add_argument("--rules", metavar="CSV", help="Rule CSV to use for a submitted job instead of the daemon's rules.")
+    daemon.add_argument("--socket", default=DAEMON_SOCKET_PATH, help="Daemon socket path (default: %(default)s).")
+    args = parser.parse_args()
+    args.batch = bool(args.folders or args.glob or args.recursive)
+    return args
+
+
+def create_optimizer():
+    """Returns the PDF optimization stage if it is enabled in config, else None."""
+    if not OPTIMIZE_PDFS:
+        return None
+    return PdfOptimizer(PDF_CACHE_DIR, min_saving_ratio=PDF_MIN_SAVING_RATIO, max_workers=PDF_OPTIMIZE_WORKERS)
+
 
+def schedule_options(name, eta_model=None):
+    """
+    Options for a scheduling strategy: round-robin turns are one upload
+    batch long, and shortest-upload uses the learned throughput model.
+    """
+    if name == "round-robin":
+        return {"batch_size": MAX_FILES_PER_UPLOAD}
+    if name == "shortest-upload" and eta_model:
+        return {"estimate": eta_model.estimate_item}
+    return {}
+
+
+def plan_interactive(folder_reader, dispatcher):
+    """Prompts for a single folder and returns its (queue, unmatched) plan."""
     selected_folder = folder_reader.select_folder()
     if not selected_folder:
         logging.info("No folder selected. Exiting.")
+        return None
+    return dispatcher.get_processed_queue(target_folder=selected_folder)
+
+
+def plan_batch(folder_reader, dispatcher, args):
+    """Resolves the batch folders and returns their merged (queue, unmatched) plan."""
+    folders = folder_reader.resolve_folders(folders=args.folders, pattern=args.glob, recursive=args.recursive)
+    if not folders:
+        logging.info("No folders resolved for batch mode. Exiting.")
+        return None
+    return dispatcher.get_batch_queue(folders, max_workers=args.workers)
+
+
+def submit(args):
+    """Submits a folder to the daemon and prints its progress as it streams back."""
+    try:
+        for event in submit_job(args.socket, args.submit, rules=args.rules):
+            if event["event"] == "plan":
+                print(f"\n--- Sending Plan ({len(event['items'])} item(s)) ---")
+                for item in event["items"]: print(f"  - Send '{item['file']}' to '{item['group_name']}'")
+                if event["unmatched"]: print("\nUnmatched files:", *event["unmatched"], sep="\n  - ")
+            elif event["event"] in ("queued", "skipped"):
+                print(event["message"])
+            elif event["event"] == "progress":
+                print_progress(event)
+            elif event["event"] == "done":
+                print_report(event["successful"], event["failed"], names_only=True)
+            elif event["event"] == "error":
+                print(f"❌ Daemon error: {event['message']}")
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"❌ No daemon is listening on '{args.socket}'. Start one with: python main.py --daemon")
+
+
+def main():
+    """Main entry point for the application."""
+    args = parse_args()
+    setup_logging(level="DEBUG" if args.debug else LOG_LEVEL)
+    logging.info("--- WhatsApp PDF Distributor v4.0 ---")
+
+    if args.submit:
+        submit(args)
+        return
+    if args.metrics:
+        metrics.open(Path(METRICS_DIR) / f"run-{time.strftime('%Y%m%d-%H%M%S')}.jsonl")
+    try:
+        run(args)
+    finally:
+        if args.metrics:
+            log_summary()
+
+
+def run(args):
+    """Runs the mode selected on the command line."""
+    ledger = SendLedger(SEND_LEDGER_PATH) if USE_SEND_LEDGER else None
+    history = SendHistory(SEND_HISTORY_PATH) if RECORD_SEND_HISTORY else None
+    eta_model = ThroughputModel.from_history(history)
+    if args.daemon:
+        DistributorDaemon(
+            args.socket, backend_name=args.backend, rule_store=RuleStore.from_config(), ledger=ledger,
+            optimizer=create_optimizer(), schedule=args.schedule,
+            schedule_options=schedule_options(args.schedule, eta_model), history=history,
+        ).serve_forever()
+        return
+
+    if args.shards > 1 and args.watch is None:
+        send_sharded(args, ledger, eta_model)
         return
 
-    queue, unmatched = dispatcher.get_processed_queue(target_folder=selected_folder)
-    sorted_queue = sorter.sort_by_size(queue)
+    sender = WhatsAppFileSender(backend_name=args.backend, ledger=ledger, history=history, eta_model=eta_model)
+    if args.watch is not None:
+        watch(args, sender, ledger, eta_model)
+        return
+    if sender.is_async:
+        sorted_queue = plan_and_confirm(args, sender, ledger, eta_model)
+        if sorted_queue:
+            asyncio.run(send_plan_async(sender, sorted_queue, interactive=not args.batch))
+        return
+
+    # Launch the browser right away so it loads and logs in during planning.
+    sender.initialize_in_background(interactive=not args.batch)
+    try:
+        sorted_queue = plan_and_confirm(args, sender, ledger, eta_model)
+        if sorted_queue:
+            send_plan(sender, sorted_queue, interactive=not args.batch)
+    finally:
+        sender.shutdown()
+        logging.info("--- Application Finished ---")
+
+
+def send_sharded(args, ledger, eta_model):
+    """Plans as usual, then sends with one process (and browser profile) per shard."""
+    try:
+        sharded = ShardedSender(
+            args.backend,
+            shard_profile_dirs(USER_DATA_DIR, args.shards),
+            ledger_path=ledger.db_path if ledger else None,
+            log_level="DEBUG" if args.debug else LOG_LEVEL,
+            accounts=SHARD_ACCOUNTS,
+        )
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    sorted_queue = plan_and_confirm(args, None, ledger, eta_model)
+    if sorted_queue:
+        print_report(*sharded.send_queue(sorted_queue, interactive=not args.batch))
+    logging.info("--- Application Finished ---")
+
+
+def watch(args, sender, ledger, eta_model):
+    """Runs watch mode: a long-lived sender fed with new PDFs from the watched folders."""
+    if sender.is_async:
+        print("❌ Watch mode needs a synchronous backend (selenium or playwright).")
+        return
+    folders = FolderReader(workspace_path=args.workspace).resolve_folders(folders=args.watch) if args.watch \
+        else [args.workspace]
+    watcher = FolderWatcher(
+        folders,
+        dispatcher=DispatcherController(rule_store=RuleStore.from_config(), ledger=ledger),
+        sender=sender,
+        settle_seconds=WATCH_SETTLE_SECONDS,
+        coalesce_seconds=WATCH_COALESCE_SECONDS,
+        poll_seconds=WATCH_POLL_SECONDS,
+        optimizer=create_optimizer(),
+        strategy=create_strategy(args.schedule, **schedule_options(args.schedule, eta_model)),
+    )
+    try:
+        sender.initialize(interactive=False)
+        watcher.run()
+    except Exception as e:
+        logging.critical(f"A critical error occurred in watch mode: {e}")
+    finally:
+        sender.shutdown()
+        logging.info("--- Application Finished ---")
+
+
+def plan_and_confirm(args, sender, ledger, eta_model):
+    """
+    Runs the preparation phase and returns the sorted queue, or None if there
+    is nothing to send or the user cancels. The first target chat is
+    pre-opened while the plan is reviewed (when a sender is given).
+    """
+    # --- PHASE 1: PREPARATION (Console only) ---
+    folder_reader = FolderReader(workspace_path=args.workspace)
+    dispatcher = DispatcherController(
+        rule_store=RuleStore.from_config(), ledger=ledger, skip_already_sent=not args.resend
+    )
+    sorter = FileSorter()
+
+    plan = plan_batch(folder_reader, dispatcher, args) if args.batch else plan_interactive(folder_reader, dispatcher)
+    if plan is None:
+        return None
+    queue, unmatched = plan
+    optimizer = create_optimizer()
+    if optimizer and queue:
+        queue = optimizer.optimize_queue(queue)
+    sorted_queue = sorter.sort(queue, args.schedule, **schedule_options(args.schedule, eta_model))
 
     if not sorted_queue:
         logging.info("Queue is empty. Nothing to send.")
         if unmatched: print("\nUnmatched files:", *[f.name for f in unmatched], sep="\n  - ")
-        return
+        return None
 
+    if sender:
+        sender.preopen_chat(sorted_queue[0]["group_name"])
     print("\n--- Sending Plan ---")
+    report = sorter.last_switch_report
+    fewer = report["size_only"] - report["scheduled"]
+    comparison = f"{abs(fewer)} {'fewer' if fewer >= 0 else 'more'} than sending smallest first"
+    print(f"  ({report['scheduled']} chat switch(es) with the '{args.schedule}' order, {comparison})")
+    saved_bytes = sum(item["original_size"] - item["file_size"] for item in sorted_queue if "original_size" in item)
+    if saved_bytes:
+        print(f"  ({saved_bytes / 1024:.0f} KiB less to upload after PDF optimization)")
+    eta_seconds = eta_model.estimate_queue(
+        sorted_queue,
+        batch_size=max(1, MAX_FILES_PER_UPLOAD),
+        min_interval=60 / RATE_LIMIT_PER_MINUTE if RATE_LIMIT_PER_MINUTE else 0.0,
+    )
+    basis = f"from {eta_model.samples} past upload(s)" if eta_model.samples else "default estimate, no history yet"
+    print(f"  (estimated time: {format_duration(eta_seconds)}, {basis})")
     for item in sorted_queue: print(f"  - Send '{item['file_path'].name}' to '{item['group_name']}'")
-    if input("\nProceed? (y/n): ").lower() not in ['y', 'yes']:
+    if not args.batch and input("\nProceed? (y/n): ").lower() not in ['y', 'yes']:
         print("Sending cancelled.")
-        return
+        return None
+    return sorted_queue
+
+
+def print_progress(progress):
+    """Prints one progress update from send_queue (or a daemon 'progress' event)."""
+    status = "✅" if progress["sent"] else "❌"
+    eta = f", about {format_duration(progress['eta_seconds'])} left" if progress.get("eta_seconds") is not None else ""
+    print(f"{status} [{progress['done']}/{progress['total']}{eta}] {', '.join(progress['files'])} -> '{progress['group_name']}'")
 
-    # --- PHASE 2: AUTOMATION ---
-    sender = WhatsAppFileSender()
+
+def print_report(successful, failed, names_only=False):
+    """Prints the end-of-run summary (items carry 'file' names when names_only)."""
+    print("\n--- Sending Complete ---")
+    print(f"✅ Successful sends: {len(successful)}")
+    print(f"❌ Failed sends: {len(failed)}")
+    if failed:
+        print("Failed items:")
+        for item in failed:
+            name = item["file"] if names_only else item["file_path"].name
+            print(f"  - '{name}' to '{item['group_name']}'")
+
+
+def send_plan(sender, sorted_queue, interactive):
+    """Sends the queue with a synchronous backend (the caller shuts it down)."""
     try:
-        sender.initialize()
-        successful, failed = sender.send_queue(sorted_queue)
+        sender.initialize(interactive=interactive)
+        print_report(*sender.send_queue(sorted_queue, on_progress=print_progress))
+    except Exception as e:
+        logging.critical(f"A critical error occurred in the main application: {e}")
 
-        print("\n--- Sending Complete ---")
-        print(f"✅ Successful sends: {len(successful)}")
-        print(f"❌ Failed sends: {len(failed)}")
-        if failed:
-            print("Failed items:")
-            for item in failed: print(f"  - '{item['file_path'].name}' to '{item['group_name']}'")
 
+async def send_plan_async(sender, sorted_queue, interactive):
+    """Sends the queue with an asyncio backend."""
+    try:
+        await sender.initialize_async(interactive=interactive)
+        print_report(*await sender.send_queue_async(sorted_queue))
     except Exception as e:
         logging.critical(f"A critical error occurred in the main application: {e}")
     finally:
-        sender.shutdown()
+        await sender.shutdown_async()
         logging.info("--- Application Finished ---")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,207 @@
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+from src.core.dispatcher import DispatcherController
+from src.core.history import SendHistory, ThroughputModel
+from src.core.ledger import SendLedger
+from src.core.rule_store import RuleStore
+from src.core.sender import WhatsAppFileSender
+from src.core.sender_backends.pool import BackendPool
+from src.core.sorter import FileSorter, GROUPED
+
+# Wire protocol: one JSON object per line in each direction.
+# Request:  {"folder": "<path>", "rules": "<csv path>" | [<rule dicts>] (optional)}
+# Replies:  a stream of {"event": ...} objects ending with "done" or "error".
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    """Handles one job-submission connection."""
+
+    def handle(self):
+        daemon: "DistributorDaemon" = self.server.distributor
+
+        client_gone = False
+
+        def emit(event: str, **payload):
+            # A job keeps sending after its client has gone; the events are dropped.
+            nonlocal client_gone
+            if client_gone:
+                return
+            message = json.dumps({"event": event, **payload}, default=str) + "\n"
+            try:
+                self.wfile.write(message.encode("utf-8"))
+                self.wfile.flush()
+            except OSError:
+                client_gone = True
+                logging.warning("Job client disconnected before the job finished; the job carries on.")
+
+        try:
+            request = json.loads(self.rfile.readline().decode("utf-8"))
+            daemon.run_job(request, emit)
+        except Exception as e:
+            logging.error(f"Job failed: {e}")
+            emit("error", message=str(e))
+
+
+class _DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class DistributorDaemon:
+    """
+    A long-running service that owns a logged-in browser (through a
+    BackendPool) and accepts jobs over a Unix domain socket. Jobs run one
+    at a time on the shared browser; clients receive progress as it happens.
+    """
+
+    def __init__(
+        self,
+        socket_path: str | Path,
+        backend_name: str,
+        rule_store: RuleStore,
+        ledger: SendLedger | None = None,
+        optimizer=None,
+        schedule: str = GROUPED,
+        schedule_options: Dict[str, Any] | None = None,
+        history: SendHistory | None = None,
+    ):
+        self.socket_path = Path(socket_path)
+        self.rule_store = rule_store
+        # Stores for CSVs named by jobs, kept so their compiled rules are reused.
+        self._job_rule_stores: Dict[str, RuleStore] = {}
+        self.ledger = ledger
+        # Optional PdfOptimizer stage applied before sorting.
+        self.optimizer = optimizer
+        self.pool = BackendPool(backend_name, size=1, interactive=False)
+        self.sorter = FileSorter()
+        self.schedule = schedule
+        self.schedule_options = schedule_options or {}
+        self.history = history
+        # Created on the first job and shared by all jobs, so pacing carries over between them.
+        self.rate_limiter = None
+        self._job_lock = threading.Lock()
+
+    def _dispatcher_for(self, rules_override) -> DispatcherController:
+        """
+        Private method to build the dispatcher for a job's rules. CSV rules
+        are reloaded if the file changed since the last job.
+        """
+        if rules_override is None:
+            rule_store = self.rule_store
+        elif isinstance(rules_override, str):
+            rule_store = self._job_rule_stores.setdefault(rules_override, RuleStore(rules_override))
+        else:
+            return DispatcherController(rule_mapping=rules_override, ledger=self.ledger)
+        rule_store.reload_if_changed()
+        return DispatcherController(rule_store=rule_store, ledger=self.ledger)
+
+    def run_job(self, request: Dict[str, Any], emit):
+        """Plans and sends one job, streaming events through `emit`."""
+        folder = Path(request["folder"]).expanduser()
+        if not folder.is_dir():
+            emit("error", message=f"Folder not found: '{folder}'")
+            return
+
+        queue, unmatched = self._dispatcher_for(request.get("rules")).get_processed_queue(folder)
+        if self.optimizer and queue:
+            queue = self.optimizer.optimize_queue(queue)
+        sorted_queue = self.sorter.sort(queue, self.schedule, **self.schedule_options)
+        emit(
+            "plan",
+            folder=str(folder),
+            items=[{"file": item["file_path"].name, "group_name": item["group_name"]} for item in sorted_queue],
+            unmatched=[path.name for path in unmatched],
+        )
+        if not sorted_queue:
+            emit("done", successful=[], failed=[])
+            return
+
+        if not self._job_lock.acquire(blocking=False):
+            emit("queued", message="Waiting for the current job to finish...")
+            self._job_lock.acquire()
+        try:
+            if self.ledger:
+                # An earlier job (e.g. the same folder submitted twice) may
+                # have sent some of these items while this one was planned.
+                sorted_queue, already_sent = self.ledger.filter_unsent(sorted_queue)
+                if already_sent:
+                    emit(
+                        "skipped",
+                        message=f"Skipping {len(already_sent)} item(s) sent by an earlier job.",
+                        items=[{"file": i["file_path"].name, "group_name": i["group_name"]} for i in already_sent],
+                    )
+            if not sorted_queue:
+                emit("done", successful=[], failed=[])
+                return
+            sender = WhatsAppFileSender(
+                pool=self.pool,
+                rate_limiter=self.rate_limiter,
+                ledger=self.ledger,
+                history=self.history,
+                # Refitted per job, so each job's estimate learns from the previous ones.
+                eta_model=ThroughputModel.from_history(self.history),
+            )
+            self.rate_limiter = sender.rate_limiter
+            sender.initialize()
+            try:
+                successful, failed = sender.send_queue(
+                    sorted_queue, on_progress=lambda progress: emit("progress", **progress)
+                )
+            finally:
+                sender.shutdown()
+        finally:
+            self._job_lock.release()
+
+        emit(
+            "done",
+            successful=[{"file": i["file_path"].name, "group_name": i["group_name"]} for i in successful],
+            failed=[{"file": i["file_path"].name, "group_name": i["group_name"]} for i in failed],
+        )
+
+    def serve_forever(self):
+        """Warms up the browser, then serves jobs until interrupted."""
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("Daemon mode needs Unix domain sockets, which this platform lacks.")
+
+        logging.info("Warming up the browser backend...")
+        self.pool.release(self.pool.acquire())
+
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        server = _DaemonServer(str(self.socket_path), _JobHandler)
+        server.distributor = self
+        os.chmod(self.socket_path, 0o600)
+        logging.info(f"Distributor daemon listening on '{self.socket_path}'.")
+        print(f"Daemon ready. Listening on {self.socket_path} (Ctrl+C to stop).")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+            self.pool.shutdown()
+            logging.info("Distributor daemon stopped.")
+
+
+def submit_job(socket_path: str | Path, folder: str | Path, rules=None) -> Iterator[Dict[str, Any]]:
+    """Submits a job to a running daemon and yields its events as they arrive."""
+    request: Dict[str, Any] = {"folder": str(Path(folder).expanduser().resolve())}
+    if rules is not None:
+        request["rules"] = str(Path(rules).resolve()) if isinstance(rules, (str, Path)) else rules
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(socket_path))
+        client.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        with client.makefile("r", encoding="utf-8") as stream:
+            for line in stream:
+                event = json.loads(line)
+                yield event
+                if event["event"] in ("done", "error"):
+                    return
@@ -3,65 +3,139 @@
 # File Discovery and File Queuing
 
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Tuple
 
+from src.core.file_record import FileRecord
+from src.core.ledger import SendLedger
+from src.core.matcher import KeywordMatcher
+from src.core.rule_store import RuleStore
+
 class DispatcherController:
     """
     A service class responsible for creating and hydrating the dispatch queue.
     """
-    def __init__(self, rule_mapping: List[Dict[str, Any]]):
-        self.rule_mapping = rule_mapping
+    def __init__(
+        self,
+        rule_mapping: List[Dict[str, Any]] | None = None,
+        ledger: SendLedger | None = None,
+        skip_already_sent: bool = True,
+        rule_store: RuleStore | None = None,
+    ):
+        # Rules come from `rule_store` (which may be reloaded while we run),
+        # or from a fixed `rule_mapping`.
+        self.rule_store = rule_store or RuleStore(rules=rule_mapping)
+        # When set, queue items get a content hash and (file, group) pairs
+        # already delivered are left out of the queue (unless skip_already_sent is False).
+        self.ledger = ledger
+        self.skip_already_sent = skip_already_sent
+
+    @property
+    def rule_mapping(self) -> List[Dict[str, Any]]:
+        return self.rule_store.rules
+
+    @property
+    def matcher(self) -> KeywordMatcher:
+        return self.rule_store.matcher
 
-    def _discover_pdfs(self, target_folder: Path) -> List[Path]:
-        """Private method to find all PDF files in a given directory."""
+    def _discover_pdfs(self, target_folder: Path) -> List[FileRecord]:
+        """
+        Private method to find all PDF files in a given directory in a single
+        os.scandir pass, stat'ing each PDF exactly once.
+        """
         logging.info(f"Scanning for PDF files in '{target_folder.name}'...")
-        return [
-            file_path for file_path in target_folder.iterdir()
-            if file_path.is_file() and file_path.suffix.lower() == '.pdf'
-        ]
+        records = []
+        with os.scandir(target_folder) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith('.pdf'):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    records.append(FileRecord.from_dir_entry(entry))
+                except FileNotFoundError:
+                    logging.warning(f"File vanished during discovery, skipping: {entry.name}")
+        return records
 
-    def _create_base_queue(self, target_folder: Path) -> Tuple[List[Dict[str, Any]], List[Path]]:
+    def _create_base_queue(self, pdf_records: List[FileRecord]) -> Tuple[List[Dict[str, Any]], List[Path]]:
         """Private method to apply mapping rules and create a base queue."""
-        pdf_files = self._discover_pdfs(target_folder)
-        if not pdf_files:
+        if not pdf_records:
             return [], []
 
-        logging.info(f"Found {len(pdf_files)} PDF file(s). Applying mapping rules...")
+        logging.info(f"Found {len(pdf_records)} PDF file(s). Applying mapping rules...")
         base_queue = []
         unmatched_files = []
 
-        for pdf_path in pdf_files:
-            file_was_matched = False
-            pdf_name_lower = pdf_path.name.lower()
-            for rule in self.rule_mapping:
-                if any(keyword.lower() in pdf_name_lower for keyword in rule.get("keywords", [])):
-                    file_was_matched = True
-                    for group_name in rule.get("target_groups", []):
-                        base_queue.append({'file_path': pdf_path, 'group_name': group_name})
-            if not file_was_matched:
-                unmatched_files.append(pdf_path)
+        for record in pdf_records:
+            targets = self.matcher.targets(record.name)
+            if targets is None:
+                unmatched_files.append(record.path)
+                continue
+            for group_name, priority in targets:
+                base_queue.append(
+                    {'file_path': record.path, 'group_name': group_name, 'priority': priority, 'record': record}
+                )
         return base_queue, unmatched_files
 
     def _hydrate_queue_with_sizes(self, base_queue: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Private method to add file sizes and handle FileNotFoundError."""
+        """
+        Private method to add file sizes from each item's FileRecord.
+        The sizes were captured during discovery, so no further stat calls are made.
+        """
         logging.info("Hydrating queue with file sizes...")
-        hydrated_queue = []
         for item in base_queue:
-            try:
-                file_path = item['file_path']
-                file_size = file_path.stat().st_size
-                item['file_size'] = file_size
-                hydrated_queue.append(item)
-            except FileNotFoundError:
-                logging.warning(f"File not found during hydration, skipping: {item['file_path'].name}")
-                continue
-        return hydrated_queue
+            item['file_size'] = item['record'].size
+        return base_queue
 
     def get_processed_queue(self, target_folder: Path) -> Tuple[List[Dict[str, Any]], List[Path]]:
         """
         Public method to orchestrate the creation and hydration of the queue.
         """
-        base_queue, unmatched_files = self._create_base_queue(target_folder)
+        return self.get_queue_for_records(self._discover_pdfs(target_folder))
+
+    def get_queue_for_records(self, pdf_records: List[FileRecord]) -> Tuple[List[Dict[str, Any]], List[Path]]:
+        """
+        Public method to route already-discovered files (e.g. from watch mode)
+        through the rules, hydration and ledger stages.
+        """
+        base_queue, unmatched_files = self._create_base_queue(pdf_records)
         hydrated_queue = self._hydrate_queue_with_sizes(base_queue)
-        return hydrated_queue, unmatched_files
\ No newline at end of file
+        if self.ledger:
+            hydrated_queue, already_sent = self.ledger.filter_unsent(hydrated_queue)
+            if already_sent and self.skip_already_sent:
+                logging.info(f"Skipping {len(already_sent)} item(s) already sent according to the ledger.")
+            else:
+                hydrated_queue += already_sent
+        return hydrated_queue, unmatched_files
+
+    def get_batch_queue(
+        self, target_folders: List[Path], max_workers: int = 8
+    ) -> Tuple[List[Dict[str, Any]], List[Path]]:
+        """
+        Public method to scan several folders in parallel on a thread pool and
+        merge their plans into one dispatch queue (in folder order).
+        """
+        if not target_folders:
+            return [], []
+
+        logging.info(f"Scanning {len(target_folders)} folder(s) with up to {max_workers} worker(s)...")
+        merged_queue, merged_unmatched = [], []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for folder, result in zip(target_folders, executor.map(self._safe_process_folder, target_folders)):
+                if result is None:
+                    continue
+                queue, unmatched_files = result
+                merged_queue.extend(queue)
+                merged_unmatched.extend(unmatched_files)
+        logging.info(f"Batch plan contains {len(merged_queue)} item(s) from {len(target_folders)} folder(s).")
+        return merged_queue, merged_unmatched
+
+    def _safe_process_folder(self, target_folder: Path) -> Tuple[List[Dict[str, Any]], List[Path]] | None:
+        """Private method to process one folder, logging (not raising) OS errors."""
+        try:
+            return self.get_processed_queue(target_folder)
+        except OSError as e:
+            logging.error(f"Could not scan folder '{target_folder}', skipping. Error: {e}")
+            return None
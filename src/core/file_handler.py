@@ -1,3 +1,5 @@
+import logging
+import os
 from pathlib import Path
 from typing import List, Dict, Any, Tuple
 from config import DEFAULT_WORKSPACE
@@ -56,3 +58,47 @@ class FolderReader:
                     print("⚠️ Invalid input. Please enter 'y' or 'n'.")
 
             print("\nReturning to folder list...")
+
+    def resolve_folders(
+        self,
+        folders: List[str | Path] | None = None,
+        pattern: str | None = None,
+        recursive: bool = False,
+    ) -> List[Path]:
+        """
+        Non-interactively resolves the folders to process in batch mode.
+
+        - `folders`: explicit paths; relative paths are looked up in the workspace.
+        - `pattern`: a glob evaluated against the workspace (e.g. "reports_*").
+        - `recursive`: every directory beneath the workspace.
+
+        Duplicates are removed and the original order is kept.
+        """
+        resolved: List[Path] = []
+
+        for folder in folders or []:
+            folder_path = Path(folder).expanduser()
+            if not folder_path.is_absolute() and not folder_path.is_dir():
+                folder_path = self.workspace / folder_path
+            if folder_path.is_dir():
+                resolved.append(folder_path)
+            else:
+                logging.warning(f"Batch folder not found, skipping: '{folder}'")
+
+        if pattern:
+            matches = sorted(p for p in self.workspace.glob(pattern) if p.is_dir())
+            if not matches:
+                logging.warning(f"No folders in '{self.workspace}' match the pattern '{pattern}'.")
+            resolved.extend(matches)
+
+        if recursive:
+            if not self.workspace.is_dir():
+                logging.error(f"Workspace directory not found at '{self.workspace}'")
+            else:
+                for dir_path, dir_names, _ in os.walk(self.workspace):
+                    dir_names.sort()
+                    resolved.extend(Path(dir_path) / name for name in dir_names)
+
+        unique_folders = list(dict.fromkeys(p.resolve() for p in resolved))
+        logging.info(f"Resolved {len(unique_folders)} folder(s) for batch processing.")
+        return unique_folders
@@ -0,0 +1,45 @@
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True, slots=True)
+class FileRecord:
+    """
+    An immutable snapshot of a discovered file, taken from a single stat call.
+    Every queue item built from the same file shares one record.
+    """
+
+    path: Path
+    size: int
+    mtime: float
+    mtime_ns: int = 0
+    inode: int = 0
+
+    @classmethod
+    def from_dir_entry(cls, entry: os.DirEntry) -> "FileRecord":
+        """Builds a record from an os.scandir entry (raises OSError if the file vanished)."""
+        stat_result = entry.stat()
+        return cls(
+            path=Path(entry.path),
+            size=stat_result.st_size,
+            mtime=stat_result.st_mtime,
+            mtime_ns=stat_result.st_mtime_ns,
+            inode=stat_result.st_ino,
+        )
+
+    @classmethod
+    def from_path(cls, path: Path) -> "FileRecord":
+        """Builds a record by stat'ing a path (raises OSError if the file is missing)."""
+        stat_result = os.stat(path)
+        return cls(
+            path=Path(path),
+            size=stat_result.st_size,
+            mtime=stat_result.st_mtime,
+            mtime_ns=stat_result.st_mtime_ns,
+            inode=stat_result.st_ino,
+        )
+
+    @property
+    def name(self) -> str:
+        return self.path.name
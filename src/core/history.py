@@ -0,0 +1,204 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from src.core.scheduling import DEFAULT_SEND_OVERHEAD_SECONDS, DEFAULT_UPLOAD_BYTES_PER_SECOND
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS send_history (
+    recorded_at REAL NOT NULL,
+    group_name  TEXT NOT NULL,
+    files       INTEGER NOT NULL,
+    bytes       INTEGER NOT NULL,
+    switched    INTEGER NOT NULL,
+    duration    REAL NOT NULL,
+    ok          INTEGER NOT NULL
+);
+"""
+
+# Assumed cost of opening a chat until enough history has been recorded.
+DEFAULT_CHAT_SWITCH_SECONDS = 4.0
+# Fewer samples than this and the defaults are used instead of a fit.
+MIN_SAMPLES_TO_FIT = 5
+# A group needs this many samples before it gets its own overhead correction.
+MIN_GROUP_SAMPLES = 3
+
+
+class SendHistory:
+    """
+    A local SQLite record of how long each upload batch took: its group,
+    file count, size, whether a chat switch was needed, and the duration.
+    """
+
+    def __init__(self, db_path: str | Path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def record(self, group_name: str, files: int, size: int, switched: bool, duration: float, ok: bool):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO send_history VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), group_name, files, size, int(switched), duration, int(ok)),
+            )
+
+    def samples(self, limit: int = 5000) -> List[Dict[str, Any]]:
+        """The most recent successful batches, newest first."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT group_name, files, bytes, switched, duration FROM send_history "
+                "WHERE ok = 1 ORDER BY recorded_at DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [
+            {"group_name": g, "files": f, "bytes": b, "switched": bool(s), "duration": d} for g, f, b, s, d in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def _solve(matrix: List[List[float]], vector: List[float]) -> List[float] | None:
+    """Solves a small linear system by Gaussian elimination (None if it is singular)."""
+    size = len(vector)
+    rows = [row[:] + [value] for row, value in zip(matrix, vector)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r: abs(rows[r][col]))
+        if abs(rows[pivot][col]) < 1e-12:
+            return None
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        for r in range(size):
+            if r != col:
+                factor = rows[r][col] / rows[col][col]
+                rows[r] = [a - factor * b for a, b in zip(rows[r], rows[col])]
+    return [rows[i][size] / rows[i][i] for i in range(size)]
+
+
+class ThroughputModel:
+    """
+    Predicts how long sends take: a fixed overhead per upload batch, plus a
+    chat-switch cost when the chat changes, plus bytes / throughput.
+
+    Fitted by least squares on SendHistory samples, with a per-group
+    overhead correction for groups with enough history. Until there is
+    enough history, conservative defaults are used.
+    """
+
+    def __init__(
+        self,
+        overhead: float = DEFAULT_SEND_OVERHEAD_SECONDS,
+        switch_cost: float = DEFAULT_CHAT_SWITCH_SECONDS,
+        bytes_per_second: float = DEFAULT_UPLOAD_BYTES_PER_SECOND,
+        group_offsets: Dict[str, float] | None = None,
+        samples: int = 0,
+    ):
+        self.overhead = overhead
+        self.switch_cost = switch_cost
+        self.bytes_per_second = bytes_per_second
+        self.group_offsets = group_offsets or {}
+        # Number of samples the model was fitted on (0 = defaults).
+        self.samples = samples
+
+    @classmethod
+    def fit(cls, samples: List[Dict[str, Any]]) -> "ThroughputModel":
+        """Fits duration ~ overhead + switch_cost * switched + bytes / throughput."""
+        if len(samples) < MIN_SAMPLES_TO_FIT:
+            return cls()
+
+        features = [[1.0, float(s["switched"]), float(s["bytes"])] for s in samples]
+        durations = [s["duration"] for s in samples]
+        normal_matrix = [[sum(f[i] * f[j] for f in features) for j in range(3)] for i in range(3)]
+        normal_vector = [sum(f[i] * d for f, d in zip(features, durations)) for i in range(3)]
+        solution = _solve(normal_matrix, normal_vector)
+        default = cls()
+        if solution is None:
+            # E.g. every sample or none needed a switch: fit overhead and throughput only.
+            reduced = _solve(
+                [[normal_matrix[0][0], normal_matrix[0][2]], [normal_matrix[2][0], normal_matrix[2][2]]],
+                [normal_vector[0], normal_vector[2]],
+            )
+            if reduced:
+                overhead, seconds_per_byte = reduced
+                if all(s["switched"] for s in samples):
+                    # The fitted overhead already includes the switch.
+                    overhead -= default.switch_cost
+                solution = [overhead, default.switch_cost, seconds_per_byte]
+        if solution is None:
+            return cls()
+
+        overhead, switch_cost, seconds_per_byte = solution
+        model = cls(
+            overhead=max(0.0, overhead),
+            switch_cost=max(0.0, switch_cost),
+            # A non-positive slope means size made no measurable difference.
+            bytes_per_second=1 / seconds_per_byte if seconds_per_byte > 0 else float("inf"),
+            samples=len(samples),
+        )
+
+        residuals: Dict[str, List[float]] = {}
+        for sample in samples:
+            predicted = model.batch_seconds(sample["bytes"], sample["switched"])
+            residuals.setdefault(sample["group_name"], []).append(sample["duration"] - predicted)
+        model.group_offsets = {
+            group: sum(values) / len(values) for group, values in residuals.items() if len(values) >= MIN_GROUP_SAMPLES
+        }
+        return model
+
+    @classmethod
+    def from_history(cls, history: SendHistory | None) -> "ThroughputModel":
+        return cls.fit(history.samples()) if history else cls()
+
+    def batch_seconds(self, size: int, switched: bool, group_name: str | None = None) -> float:
+        """Predicted duration of one upload batch of `size` bytes."""
+        seconds = self.overhead + (self.switch_cost if switched else 0.0) + size / self.bytes_per_second
+        return max(0.0, seconds + self.group_offsets.get(group_name, 0.0))
+
+    def estimate_item(self, item: Dict[str, Any]) -> float:
+        """Predicted duration of sending one item on its own in an already open chat."""
+        return self.batch_seconds(item.get("file_size", 0), False, item.get("group_name"))
+
+    def estimate_queue(
+        self,
+        queue: List[Dict[str, Any]],
+        batch_size: int = 1,
+        min_interval: float = 0.0,
+        start_group: str | None = None,
+    ) -> float:
+        """
+        Predicted duration of sending a queue in order, batched like
+        send_queue (runs of one group, at most `batch_size` files). Each batch
+        takes at least `min_interval` seconds (the rate limit's spacing).
+        """
+        total = 0.0
+        current_group, batch_files, batch_bytes = start_group, 0, 0
+        batch_group, batch_switched = None, False
+
+        def close_batch():
+            return max(min_interval, self.batch_seconds(batch_bytes, batch_switched, batch_group))
+
+        for item in queue:
+            group = item["group_name"]
+            if batch_files and group == batch_group and batch_files < batch_size:
+                batch_files += 1
+                batch_bytes += item.get("file_size", 0)
+                continue
+            if batch_files:
+                total += close_batch()
+            batch_group, batch_files, batch_bytes = group, 1, item.get("file_size", 0)
+            batch_switched = group != current_group
+            current_group = group
+        if batch_files:
+            total += close_batch()
+        return total
+
+
+def format_duration(seconds: float) -> str:
+    """Formats seconds as 'h:mm:ss' or 'm:ss'."""
+    minutes, secs = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
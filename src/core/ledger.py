@@ -0,0 +1,138 @@
+import hashlib
+import logging
+import mmap
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Dict, Any, Tuple
+
+from src.core.file_record import FileRecord
+
+_HASH_SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_hashes (
+    path     TEXT PRIMARY KEY,
+    inode    INTEGER NOT NULL,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256   TEXT NOT NULL
+);
+"""
+_SENDS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sends (
+    sha256     TEXT NOT NULL,
+    group_name TEXT NOT NULL,
+    file_name  TEXT NOT NULL,
+    sent_at    TEXT NOT NULL,
+    PRIMARY KEY (sha256, group_name)
+);
+"""
+
+
+def hash_file(path: Path) -> str:
+    """Returns the SHA-256 of a file, streamed so large PDFs are never read into memory at once."""
+    with open(path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        digest = hashlib.sha256()
+        if path.stat().st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+        return digest.hexdigest()
+
+
+class HashCache:
+    """
+    Content hashes in SQLite, cached by path and (inode, size, mtime) so
+    unchanged files are not re-hashed on every run. Several processes can
+    share the file.
+    """
+
+    def __init__(self, db_path: str | Path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        # The timeout lets sharded sender processes share the file.
+        self._connection = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.executescript(_HASH_SCHEMA)
+
+    def content_hash(self, record: FileRecord) -> str:
+        """Returns the record's content hash, from the cache when the file is unchanged."""
+        path_key = os.path.abspath(record.path)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT inode, size, mtime_ns, sha256 FROM file_hashes WHERE path = ?", (path_key,)
+            ).fetchone()
+        if row and tuple(row[:3]) == (record.inode, record.size, record.mtime_ns):
+            return row[3]
+
+        sha256 = hash_file(record.path)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO file_hashes (path, inode, size, mtime_ns, sha256) VALUES (?, ?, ?, ?, ?)",
+                (path_key, record.inode, record.size, record.mtime_ns, sha256),
+            )
+        return sha256
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class SendLedger(HashCache):
+    """
+    A persistent SQLite record of what has already been delivered, keyed by
+    (file content hash, group). Re-running a folder after a crash or an
+    interruption skips every pair that was already sent.
+
+    Content hashes are cached in the same file (see HashCache).
+    """
+
+    def __init__(self, db_path: str | Path):
+        super().__init__(db_path)
+        with self._lock, self._connection:
+            self._connection.executescript(_SENDS_SCHEMA)
+
+    def filter_unsent(self, queue: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Adds a 'content_hash' to each queue item and splits the queue into
+        (still to send, already sent). Files that vanished are dropped with a warning.
+        """
+        unsent, already_sent = [], []
+        hashes: Dict[FileRecord, str] = {}
+        for item in queue:
+            record = item["record"]
+            try:
+                if record not in hashes:
+                    hashes[record] = self.content_hash(record)
+            except FileNotFoundError:
+                logging.warning(f"File not found while hashing, skipping: {record.name}")
+                continue
+            item["content_hash"] = hashes[record]
+            (already_sent if self.is_sent(item) else unsent).append(item)
+        return unsent, already_sent
+
+    def is_sent(self, item: Dict[str, Any]) -> bool:
+        """Returns True if this item's file was already delivered to its group."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM sends WHERE sha256 = ? AND group_name = ?",
+                (item["content_hash"], item["group_name"]),
+            ).fetchone()
+        return row is not None
+
+    def mark_sent(self, items: List[Dict[str, Any]]):
+        """Records items as delivered (committed immediately, so a crash right after keeps them)."""
+        sent_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        rows = [
+            (item["content_hash"], item["group_name"], item["file_path"].name, sent_at)
+            for item in items
+            if "content_hash" in item
+        ]
+        if not rows:
+            return
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO sends (sha256, group_name, file_name, sent_at) VALUES (?, ?, ?, ?)", rows
+            )
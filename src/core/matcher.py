@@ -0,0 +1,105 @@
+from collections import deque
+from typing import List, Dict, Any, Tuple
+
+
+class KeywordMatcher:
+    """
+    A compiled multi-keyword matcher built once from the rule mapping.
+
+    All rule keywords are loaded into a single Aho-Corasick automaton, so
+    every rule that matches a filename is found in one pass over the name,
+    no matter how many rules or keywords there are.
+    """
+
+    def __init__(self, rule_mapping: List[Dict[str, Any]]):
+        self.rule_mapping = rule_mapping
+        # Rules containing an empty keyword match every filename
+        # (because '' in name is always True).
+        self._always_matching: set[int] = set()
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[frozenset[int]] = [frozenset()]
+        # Priority lane of each rule (its optional 'priority' column, default 0).
+        self._priorities = [int(rule["priority"][0]) if rule.get("priority") else 0 for rule in rule_mapping]
+        self._build()
+
+    def _build(self):
+        """Private method to build the trie, failure links and outputs."""
+        outputs: List[set[int]] = [set()]
+
+        # --- Trie ---
+        for rule_idx, rule in enumerate(self.rule_mapping):
+            for keyword in rule.get("keywords", []):
+                keyword_lower = keyword.lower()
+                if not keyword_lower:
+                    self._always_matching.add(rule_idx)
+                    continue
+                state = 0
+                for char in keyword_lower:
+                    next_state = self._goto[state].get(char)
+                    if next_state is None:
+                        next_state = len(self._goto)
+                        self._goto[state][char] = next_state
+                        self._goto.append({})
+                        self._fail.append(0)
+                        outputs.append(set())
+                    state = next_state
+                outputs[state].add(rule_idx)
+
+        # --- Failure links (breadth-first) ---
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                outputs[next_state] |= outputs[self._fail[next_state]]
+
+        self._output = [frozenset(out) for out in outputs]
+
+    def match(self, filename: str) -> List[int]:
+        """
+        Returns the indices of every rule with a keyword contained in the
+        filename (case-insensitive), in rule-mapping order.
+        """
+        matched = set(self._always_matching)
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in filename.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                matched |= output[state]
+        return sorted(matched)
+
+    def target_groups(self, filename: str) -> List[str] | None:
+        """
+        Returns the target groups for a filename, one entry per matching rule
+        and group, or None if no rule matched.
+        """
+        rule_indices = self.match(filename)
+        if not rule_indices:
+            return None
+        return [
+            group_name
+            for rule_idx in rule_indices
+            for group_name in self.rule_mapping[rule_idx].get("target_groups", [])
+        ]
+
+    def targets(self, filename: str) -> List[Tuple[str, int]] | None:
+        """
+        Like target_groups, but returns (group_name, priority) pairs, where
+        the priority comes from the matching rule.
+        """
+        rule_indices = self.match(filename)
+        if not rule_indices:
+            return None
+        return [
+            (group_name, self._priorities[rule_idx])
+            for rule_idx in rule_indices
+            for group_name in self.rule_mapping[rule_idx].get("target_groups", [])
+        ]
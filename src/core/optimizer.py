@@ -0,0 +1,141 @@
+import logging
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any
+
+from src.core.file_record import FileRecord
+from src.core.ledger import HashCache
+
+try:  # Optional dependency: only needed when PDF optimization is enabled.
+    import pikepdf
+except ImportError:
+    pikepdf = None
+
+OPTIMIZED_NAME = "optimized.pdf"
+SKIP_MARKER = "not_worth_it"
+# Content hashes of source files, cached here when there is no ledger to hash them.
+HASH_CACHE_NAME = "file_hashes.sqlite3"
+
+
+def _optimize_pdf(source: str, target_dir: str, min_saving_ratio: float) -> int | None:
+    """
+    Losslessly rewrites one PDF into target_dir (run in a worker process).
+    Streams are recompressed, unreferenced resources dropped and objects
+    packed into object streams. Returns the optimized size, or None when the
+    saving is below min_saving_ratio (a marker is left so it is not retried).
+    """
+    target_dir_path = Path(target_dir)
+    target_dir_path.mkdir(parents=True, exist_ok=True)
+    tmp_path = target_dir_path / (OPTIMIZED_NAME + f".{os.getpid()}.tmp")
+    original_size = os.path.getsize(source)
+
+    with pikepdf.open(source) as pdf:
+        pdf.remove_unreferenced_resources()
+        pdf.save(
+            tmp_path,
+            compress_streams=True,
+            recompress_flate=True,
+            object_stream_mode=pikepdf.ObjectStreamMode.generate,
+        )
+
+    optimized_size = tmp_path.stat().st_size
+    if original_size == 0 or (original_size - optimized_size) / original_size < min_saving_ratio:
+        tmp_path.unlink()
+        (target_dir_path / SKIP_MARKER).touch()
+        return None
+    tmp_path.replace(target_dir_path / OPTIMIZED_NAME)
+    return optimized_size
+
+
+class PdfOptimizer:
+    """
+    An optional pipeline stage between DispatcherController and FileSorter
+    that shrinks PDFs before upload.
+
+    Results are cached in `cache_dir` by content hash, so each distinct file
+    is optimized once across runs; files whose saving is below
+    `min_saving_ratio` are remembered and sent as they are. Work runs on a
+    process pool.
+    """
+
+    def __init__(self, cache_dir: str | Path, min_saving_ratio: float = 0.05, max_workers: int | None = None):
+        if pikepdf is None:
+            raise ImportError("PDF optimization needs the 'pikepdf' package: pip install pikepdf")
+        self.cache_dir = Path(cache_dir)
+        self.min_saving_ratio = min_saving_ratio
+        self.max_workers = max_workers
+        # Opened on first use: with the ledger on, items arrive already hashed.
+        self._hash_cache: HashCache | None = None
+
+    def _upload_copy(self, entry_dir: Path, file_name: str) -> Path:
+        """Private method to expose the optimized file under the original file name."""
+        upload_path = entry_dir / file_name
+        if not upload_path.exists():
+            try:
+                os.link(entry_dir / OPTIMIZED_NAME, upload_path)
+            except OSError:
+                shutil.copy2(entry_dir / OPTIMIZED_NAME, upload_path)
+        return upload_path
+
+    def _content_hash(self, record: FileRecord) -> str:
+        """Private method returning a file's content hash, cached across runs even without a ledger."""
+        if self._hash_cache is None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._hash_cache = HashCache(self.cache_dir / HASH_CACHE_NAME)
+        return self._hash_cache.content_hash(record)
+
+    def optimize_queue(self, queue: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Optimizes every distinct file in the queue. Items whose file shrank get
+        'upload_path' (the optimized copy) and 'original_size', and their
+        'file_size' becomes the optimized size so the sorter uses it.
+        Items whose file vanished since planning are dropped with a warning.
+        """
+        sources: Dict[str, Path] = {}
+        hashed: List[Dict[str, Any]] = []
+        for item in queue:
+            if "content_hash" not in item:
+                try:
+                    record = item.get("record") or FileRecord.from_path(item["file_path"])
+                    item["content_hash"] = self._content_hash(record)
+                except FileNotFoundError:
+                    logging.warning(f"File not found while hashing, skipping: {item['file_path'].name}")
+                    continue
+            hashed.append(item)
+            sources.setdefault(item["content_hash"], item["file_path"])
+        queue = hashed
+
+        pending = {
+            content_hash: path
+            for content_hash, path in sources.items()
+            if not (self.cache_dir / content_hash / OPTIMIZED_NAME).exists()
+            and not (self.cache_dir / content_hash / SKIP_MARKER).exists()
+        }
+        if pending:
+            logging.info(f"Optimizing {len(pending)} PDF(s) on a process pool...")
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    content_hash: executor.submit(
+                        _optimize_pdf, str(path), str(self.cache_dir / content_hash), self.min_saving_ratio
+                    )
+                    for content_hash, path in pending.items()
+                }
+                for content_hash, future in futures.items():
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logging.warning(f"Could not optimize '{pending[content_hash].name}', sending it as is: {e}")
+
+        saved_bytes = 0
+        for item in queue:
+            entry_dir = self.cache_dir / item["content_hash"]
+            if not (entry_dir / OPTIMIZED_NAME).exists():
+                continue
+            item["upload_path"] = self._upload_copy(entry_dir, item["file_path"].name)
+            item["original_size"] = item["file_size"]
+            item["file_size"] = item["upload_path"].stat().st_size
+            saved_bytes += item["original_size"] - item["file_size"]
+        logging.info(f"PDF optimization saves {saved_bytes} bytes of upload across {len(queue)} item(s).")
+        return queue
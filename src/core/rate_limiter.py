@@ -0,0 +1,91 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict
+
+
+class TokenBucket:
+    """
+    A classic token bucket: holds up to `burst` tokens and refills at
+    `rate_per_minute`. Time that passes between acquisitions (e.g. while a
+    chat search or upload is running) refills the bucket, so it counts
+    toward the interval instead of being added on top of it.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        if rate_per_minute <= 0 or burst < 1:
+            raise ValueError("rate_per_minute must be positive and burst at least 1.")
+        self.rate_per_second = rate_per_minute / 60
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.last_refill = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate_per_second)
+        self.last_refill = now
+
+    def wait_time(self, tokens: float = 1) -> float:
+        """Returns how many seconds until `tokens` tokens are available (0 if now)."""
+        self._refill()
+        deficit = tokens - self.tokens
+        return max(0.0, deficit / self.rate_per_second)
+
+    def consume(self, tokens: float = 1):
+        """Takes tokens from the bucket (the balance may go negative after a forced take)."""
+        self._refill()
+        self.tokens -= tokens
+
+
+class RateLimiter:
+    """
+    A rate-limiting service with a global token bucket and optional
+    per-group buckets. `acquire(group)` blocks only for as long as needed
+    to respect both limits. A `rate_per_minute` of 0 or None disables the
+    global limit.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float | None,
+        burst: int = 1,
+        group_rate_per_minute: float | None = None,
+        group_burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.clock = clock
+        self.sleep = sleep
+        self.global_bucket = TokenBucket(rate_per_minute, burst, clock) if rate_per_minute else None
+        self.group_rate_per_minute = group_rate_per_minute
+        self.group_burst = group_burst
+        self.group_buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def min_interval(self) -> float:
+        """Seconds between sends at the sustained global rate (ignoring burst; 0 without a global limit)."""
+        return 1 / self.global_bucket.rate_per_second if self.global_bucket else 0.0
+
+    def _group_bucket(self, group_name: str) -> TokenBucket | None:
+        if not self.group_rate_per_minute:
+            return None
+        if group_name not in self.group_buckets:
+            self.group_buckets[group_name] = TokenBucket(self.group_rate_per_minute, self.group_burst, self.clock)
+        return self.group_buckets[group_name]
+
+    def acquire(self, group_name: str, tokens: float = 1) -> float:
+        """
+        Blocks until a send to `group_name` is allowed, then consumes the tokens.
+        Returns the number of seconds spent waiting.
+        """
+        with self._lock:
+            buckets = [bucket for bucket in (self.global_bucket, self._group_bucket(group_name)) if bucket]
+            wait_seconds = max((bucket.wait_time(tokens) for bucket in buckets), default=0.0)
+            if wait_seconds > 0:
+                logging.info(f"Rate limit: waiting {wait_seconds:.1f} seconds before sending to '{group_name}'...")
+                self.sleep(wait_seconds)
+            for bucket in buckets:
+                bucket.consume(tokens)
+            return wait_seconds
@@ -0,0 +1,153 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import List, Dict, Any
+
+from csv_rule_mapper import read_rule_csv
+from src.core.matcher import KeywordMatcher
+
+# Bump when the pickled layout (or KeywordMatcher's internals) changes.
+CACHE_FORMAT_VERSION = 2
+
+
+class RuleStore:
+    """
+    Loads the mapping rules on first use and keeps them compiled.
+
+    Rules come from a CSV file (or a fixed list, e.g. RULE_MAPPING in
+    config.py). CSV rules are validated and their compiled KeywordMatcher is
+    cached on disk, keyed by the file's mtime, size and content hash, so
+    later runs skip parsing and compiling. Long-running modes call
+    reload_if_changed() to pick up edits to the CSV without restarting.
+    """
+
+    def __init__(
+        self,
+        csv_path: str | Path | None = None,
+        cache_path: str | Path | None = None,
+        rules: List[Dict[str, Any]] | None = None,
+    ):
+        if csv_path is None and rules is None:
+            raise ValueError("RuleStore needs either a CSV path or a list of rules.")
+        self.csv_path = Path(csv_path) if csv_path is not None else None
+        self.cache_path = Path(cache_path) if cache_path is not None else None
+        self._rules = rules
+        self._matcher: KeywordMatcher | None = KeywordMatcher(rules) if rules is not None else None
+        # (mtime_ns, size) of the CSV the current rules were loaded from.
+        self._signature: tuple | None = None
+        # Incremented on every (re)load, so holders can tell the rules changed.
+        self.version = 0 if rules is None else 1
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> "RuleStore":
+        """The store for config.py: RULE_MAPPING if it is set, else the CSV at RULE_CSV_PATH."""
+        from config import RULE_MAPPING, RULE_CSV_PATH, RULE_CACHE_PATH
+
+        if RULE_MAPPING is not None:
+            return cls(rules=RULE_MAPPING)
+        return cls(RULE_CSV_PATH, cache_path=RULE_CACHE_PATH)
+
+    @property
+    def rules(self) -> List[Dict[str, Any]]:
+        """The current rules, loading them on first access."""
+        self._ensure_loaded()
+        return self._rules
+
+    @property
+    def matcher(self) -> KeywordMatcher:
+        """The compiled matcher for the current rules, loading them on first access."""
+        self._ensure_loaded()
+        return self._matcher
+
+    def _ensure_loaded(self):
+        if self._matcher is None:
+            with self._lock:
+                if self._matcher is None:
+                    self._load()
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reloads the CSV if it changed since it was loaded (one stat call when
+        it has not). Returns True if new rules were loaded. If the edited CSV
+        is invalid, the previous rules stay in use.
+        """
+        if self.csv_path is None:
+            return False
+        with self._lock:
+            if self._matcher is None:
+                self._load()
+                return True
+            try:
+                stat_result = os.stat(self.csv_path)
+            except OSError as e:
+                logging.warning(f"Could not check rule CSV '{self.csv_path}', keeping the current rules: {e}")
+                return False
+            if (stat_result.st_mtime_ns, stat_result.st_size) == self._signature:
+                return False
+            try:
+                self._load()
+            except (OSError, ValueError) as e:
+                # Do not retry (and re-log) until the file changes again.
+                self._signature = (stat_result.st_mtime_ns, stat_result.st_size)
+                logging.error(f"Rule CSV '{self.csv_path}' changed but could not be loaded, keeping the current rules: {e}")
+                return False
+            logging.info(f"Reloaded {len(self._rules)} rule(s) from '{self.csv_path.name}'.")
+            return True
+
+    def _load(self):
+        """Private method to load the CSV, from the compiled cache when it is still valid."""
+        stat_result = os.stat(self.csv_path)
+        signature = (stat_result.st_mtime_ns, stat_result.st_size)
+        cached = self._read_cache()
+
+        if cached and (cached["mtime_ns"], cached["size"]) == signature:
+            rules, matcher = cached["rules"], cached["matcher"]
+        else:
+            content = self.csv_path.read_bytes()
+            sha256 = hashlib.sha256(content).hexdigest()
+            if cached and cached["sha256"] == sha256:
+                # Touched but not edited: reuse the compiled rules.
+                rules, matcher = cached["rules"], cached["matcher"]
+            else:
+                rules = read_rule_csv(self.csv_path)
+                matcher = KeywordMatcher(rules)
+                logging.info(f"Compiled {len(rules)} rule(s) from '{self.csv_path.name}'.")
+            self._write_cache(
+                {"mtime_ns": signature[0], "size": signature[1], "sha256": sha256, "rules": rules, "matcher": matcher}
+            )
+
+        self._rules, self._matcher, self._signature = rules, matcher, signature
+        self.version += 1
+
+    def _read_cache(self) -> Dict[str, Any] | None:
+        """Private method to read the compiled-rules cache (None if missing, stale or unreadable)."""
+        if self.cache_path is None:
+            return None
+        try:
+            with open(self.cache_path, "rb") as f:
+                cached = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable rule cache '{self.cache_path}': {e}")
+            return None
+        if cached.get("format") != CACHE_FORMAT_VERSION or cached.get("csv_path") != str(self.csv_path):
+            return None
+        return cached
+
+    def _write_cache(self, entry: Dict[str, Any]):
+        """Private method to save the compiled rules atomically."""
+        if self.cache_path is None:
+            return
+        entry = {"format": CACHE_FORMAT_VERSION, "csv_path": str(self.csv_path), **entry}
+        tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logging.warning(f"Could not write rule cache '{self.cache_path}': {e}")
@@ -0,0 +1,188 @@
+import heapq
+import itertools
+from typing import Any, Callable, Dict, List, Tuple
+
+# Defaults for the shortest-upload-first estimate: a fixed per-send cost
+# (attach, preview, send) plus the transfer time at a nominal bandwidth.
+DEFAULT_SEND_OVERHEAD_SECONDS = 3.0
+DEFAULT_UPLOAD_BYTES_PER_SECOND = 500_000
+
+
+class SchedulingStrategy:
+    """
+    Decides the order in which queue items are sent. A strategy computes a
+    sort key once, when an item is pushed onto a DispatchHeap (smaller keys
+    go first), so items can keep arriving while earlier ones are sent.
+    Strategies that keep state (e.g. RoundRobin) are used with one heap.
+    """
+
+    name = ""
+
+    def key(self, item: Dict[str, Any]) -> Tuple:
+        raise NotImplementedError
+
+    def popped(self, key: Tuple):
+        """Called by the heap when the item with this key is taken for sending."""
+
+
+class GroupedBySize(SchedulingStrategy):
+    """
+    Each chat visited once: a group's items go out together, smallest
+    first, and groups go in the order their first item arrived (pushed
+    smallest first, that is by their smallest file). Once a group's pending
+    items have all been sent, a later item for it queues behind the groups
+    already waiting instead of jumping ahead of them.
+    """
+
+    name = "grouped"
+
+    def __init__(self):
+        self._order = itertools.count()
+        # group -> its place in the group order, and how many of its items are pending
+        self._group_order: Dict[str, int] = {}
+        self._pending: Dict[str, int] = {}
+        self._groups_by_order: Dict[int, str] = {}
+
+    def key(self, item: Dict[str, Any]) -> Tuple:
+        group = item["group_name"]
+        if group not in self._group_order:
+            order = next(self._order)
+            self._group_order[group] = order
+            self._groups_by_order[order] = group
+        self._pending[group] = self._pending.get(group, 0) + 1
+        return (self._group_order[group], item.get("file_size", 0))
+
+    def popped(self, key: Tuple):
+        group = self._groups_by_order[key[0]]
+        self._pending[group] -= 1
+        if not self._pending[group]:
+            del self._pending[group], self._group_order[group], self._groups_by_order[key[0]]
+
+
+class SizeFirst(SchedulingStrategy):
+    """Smallest file first (the classic sort_by_size order)."""
+
+    name = "size"
+
+    def key(self, item: Dict[str, Any]) -> Tuple:
+        return (item.get("file_size", 0),)
+
+
+class ShortestUploadFirst(SchedulingStrategy):
+    """
+    Shortest estimated send time first. `estimate(item)` returns seconds;
+    by default a fixed per-send overhead plus the transfer time at a
+    nominal bandwidth.
+    """
+
+    name = "shortest-upload"
+
+    def __init__(self, estimate: Callable[[Dict[str, Any]], float] | None = None):
+        self.estimate = estimate or (
+            lambda item: DEFAULT_SEND_OVERHEAD_SECONDS + item.get("file_size", 0) / DEFAULT_UPLOAD_BYTES_PER_SECOND
+        )
+
+    def key(self, item: Dict[str, Any]) -> Tuple:
+        return (self.estimate(item),)
+
+
+class RoundRobin(SchedulingStrategy):
+    """
+    Fair turns across groups: each group gets up to `batch_size` files per
+    round (in arrival order), so one group with hundreds of files cannot
+    hold back every other group. A group's files in a round stay together,
+    keeping uploads batched. Items arriving later join the current round,
+    not the round after everything a busy group has already queued.
+    """
+
+    name = "round-robin"
+
+    def __init__(self, batch_size: int = 1):
+        self.batch_size = max(1, batch_size)
+        # group -> next free slot (slot // batch_size is the round)
+        self._next_slot: Dict[str, int] = {}
+        self._group_order: Dict[str, int] = {}
+        self._current_round = 0
+
+    def key(self, item: Dict[str, Any]) -> Tuple:
+        group = item["group_name"]
+        slot = max(self._next_slot.get(group, 0), self._current_round * self.batch_size)
+        self._next_slot[group] = slot + 1
+        group_order = self._group_order.setdefault(group, len(self._group_order))
+        return (slot // self.batch_size, group_order)
+
+    def popped(self, key: Tuple):
+        self._current_round = max(self._current_round, key[0])
+
+
+class PriorityLanes(SchedulingStrategy):
+    """
+    Higher 'priority' (from the rule's priority column) always goes first;
+    items in the same lane are ordered by `inner` (by default grouped, so
+    each chat is visited once per lane).
+    """
+
+    name = "priority"
+
+    def __init__(self, inner: SchedulingStrategy | None = None):
+        self.inner = inner or GroupedBySize()
+
+    def key(self, item: Dict[str, Any]) -> Tuple:
+        return (-item.get("priority", 0),) + self.inner.key(item)
+
+    def popped(self, key: Tuple):
+        self.inner.popped(key[1:])
+
+
+STRATEGIES: Dict[str, Callable[..., SchedulingStrategy]] = {
+    GroupedBySize.name: GroupedBySize,
+    SizeFirst.name: SizeFirst,
+    ShortestUploadFirst.name: ShortestUploadFirst,
+    RoundRobin.name: RoundRobin,
+    PriorityLanes.name: PriorityLanes,
+}
+
+
+def create_strategy(name: str, **options) -> SchedulingStrategy:
+    """Creates a strategy by name (see STRATEGIES), passing `options` to it."""
+    try:
+        return STRATEGIES[name](**options)
+    except KeyError:
+        raise ValueError(f"Unknown scheduling strategy '{name}'. Options: {', '.join(STRATEGIES)}")
+
+
+class DispatchHeap:
+    """
+    A priority queue of dispatch items ordered by a SchedulingStrategy.
+    Pushing is O(log n), so long-running modes can add items as they arrive
+    instead of re-sorting everything. Items with equal keys keep their
+    arrival order.
+    """
+
+    def __init__(self, strategy: SchedulingStrategy):
+        self.strategy = strategy
+        self._heap: List[Tuple[Tuple, int, Dict[str, Any]]] = []
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, item: Dict[str, Any]):
+        heapq.heappush(self._heap, (self.strategy.key(item), next(self._sequence), item))
+
+    def extend(self, items: List[Dict[str, Any]]):
+        for item in items:
+            self.push(item)
+
+    def peek(self) -> Dict[str, Any]:
+        """Returns the item that pop() would return, without removing it."""
+        return self._heap[0][2]
+
+    def pop(self) -> Dict[str, Any]:
+        key, _, item = heapq.heappop(self._heap)
+        self.strategy.popped(key)
+        return item
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Pops every item, in schedule order."""
+        return [self.pop() for _ in range(len(self._heap))]
@@ -1,67 +1,421 @@
+import asyncio
 import logging
 import time
-from typing import List, Dict, Any
-from icecream import ic
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Dict, Any
 
-# This now correctly imports the refactored backend
-from src.core.sender_backends.selenium_sender import SeleniumSender
-from config import DEFAULT_STAGGER_MINUTES
+from src.core.history import SendHistory, ThroughputModel
+from src.core.ledger import SendLedger
+from src.core.sender_backends.base import SenderBackend
+from src.core.sender_backends.pool import BackendPool
+from src.core.sender_backends.registry import create_backend
+from src.core.rate_limiter import RateLimiter
+from src.core.upload_tracker import UploadTracker
+from src.utils.metrics import metrics
+from config import (
+    WHATSAPP_BACKEND,
+    MAX_FILES_PER_UPLOAD,
+    RATE_LIMIT_PER_MINUTE,
+    RATE_LIMIT_BURST,
+    GROUP_RATE_LIMIT_PER_MINUTE,
+    GROUP_RATE_LIMIT_BURST,
+    UPLOAD_CONFIRM_TIMEOUT_SECONDS,
+    UPLOAD_INDICATOR_GRACE_SECONDS,
+)
 
 class WhatsAppFileSender:
     """High-level API for sending a queue of files via WhatsApp."""
 
-    def __init__(self):
-        self.backend = SeleniumSender()
+    def __init__(
+        self,
+        backend: SenderBackend | None = None,
+        backend_name: str = WHATSAPP_BACKEND,
+        pool: BackendPool | None = None,
+        rate_limiter: RateLimiter | None = None,
+        ledger: SendLedger | None = None,
+        history: SendHistory | None = None,
+        eta_model: ThroughputModel | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        max_files_per_upload: int = MAX_FILES_PER_UPLOAD,
+    ):
+        """
+        Uses `backend` if given; otherwise leases a warm backend from `pool`
+        on initialize(), or creates a fresh `backend_name` backend.
+        Pass a shared `rate_limiter` to keep pacing across several senders, and
+        a `ledger` to record each delivery as soon as it succeeds.
+        A `history` records how long each upload took, and an `eta_model`
+        adds the estimated remaining time to progress reports.
+        `clock` and `sleep` time and pace upload confirmation.
+        Up to `max_files_per_upload` consecutive files for a group are sent
+        in one upload action.
+        """
+        self.pool = pool
+        self.ledger = ledger
+        self.history = history
+        self.eta_model = eta_model
+        self.clock = clock
+        self.sleep = sleep
+        self.max_files_per_upload = max(1, max_files_per_upload)
+        if backend is None and pool is None:
+            backend = create_backend(backend_name)
+        self.backend = backend
+        self.rate_limiter = rate_limiter or RateLimiter(
+            rate_per_minute=RATE_LIMIT_PER_MINUTE,
+            burst=RATE_LIMIT_BURST,
+            group_rate_per_minute=GROUP_RATE_LIMIT_PER_MINUTE,
+            group_burst=GROUP_RATE_LIMIT_BURST,
+        )
+        # The chat currently open in the browser, if known.
+        self.active_group: str | None = None
+        # Background start-up (see initialize_in_background).
+        self._background: ThreadPoolExecutor | None = None
+        self._startup: Future | None = None
+
+    @property
+    def is_async(self) -> bool:
+        """True if the backend is an asyncio backend (use the *_async methods)."""
+        return asyncio.iscoroutinefunction(getattr(self.backend, "select_chat", None))
+
+    def initialize_in_background(self, interactive: bool = True):
+        """
+        Starts the backend browser on a background thread, so it loads and
+        logs in while the user is still choosing a folder and reviewing the plan.
+        A later initialize() call waits for it to finish.
+        """
+        self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="browser-startup")
+        self._startup = self._background.submit(self._initialize_now, interactive)
+
+    def preopen_chat(self, group_name: str):
+        """
+        Opens a chat in the background once the browser is ready (e.g. the
+        first target while the plan is reviewed), so send_queue can skip it.
+        """
+        if not self._background:
+            return
+
+        def open_chat():
+            if self._startup.exception() is None and self.backend.select_chat(group_name):
+                self.active_group = group_name
+                logging.info(f"Pre-opened chat '{group_name}'.")
+
+        self._background.submit(open_chat)
+
+    def _finish_background(self):
+        """Private method to wait for background start-up work and re-raise its error."""
+        if not self._background:
+            return
+        self._background.shutdown(wait=True)
+        self._background = None
+        self._startup.result()
 
-    def initialize(self):
-        """Initializes the backend browser."""
-        # Corrected to call the actual method name in the backend
-        self.backend.initialize_browser()
+    def initialize(self, interactive: bool = True):
+        """Initializes the backend browser, or waits for a background start-up to finish."""
+        if self._background:
+            self._finish_background()
+            return
+        self._initialize_now(interactive)
+
+    def _initialize_now(self, interactive: bool):
+        if self.pool:
+            self.backend = self.pool.acquire()
+            return
+        self.backend.initialize_browser(interactive=interactive)
 
     def shutdown(self):
-        """Shuts down the backend browser."""
-        # Corrected to call the actual method name in the backend
+        """Shuts down the backend browser, or hands it back to the pool still warm."""
+        try:
+            self._finish_background()
+        except Exception as e:
+            logging.warning(f"Background browser start-up had failed: {e}")
+        if self.pool:
+            if self.backend:
+                self.pool.release(self.backend)
+                self.backend = None
+            return
         self.backend.shutdown_browser()
 
-    def send_queue(self, queue: List[Dict[str, Any]]):
+    @staticmethod
+    def _upload_path(item: Dict[str, Any]):
+        """Private method returning the file to upload: the optimized copy if there is one."""
+        return item.get("upload_path", item["file_path"])
+
+    @staticmethod
+    def _batch_by_group(queue: List[Dict[str, Any]], max_files: int) -> List[List[Dict[str, Any]]]:
+        """Splits the queue into runs of consecutive items for the same group, at most max_files long."""
+        batches: List[List[Dict[str, Any]]] = []
+        for item in queue:
+            if (
+                batches
+                and batches[-1][0]["group_name"] == item["group_name"]
+                and len(batches[-1]) < max_files
+            ):
+                batches[-1].append(item)
+            else:
+                batches.append([item])
+        return batches
+
+    def send_queue(
+        self,
+        queue: List[Dict[str, Any]],
+        on_progress: Callable[[Dict[str, Any]], None] | None = None,
+    ):
         """
         Processes and sends a queue of files with state-aware logic.
+        Consecutive files for the same group are attached in one upload action
+        (up to max_files_per_upload), and uploads are paced by the rate limiter.
+        The next upload is issued without waiting for the previous one to
+        finish; an UploadTracker confirms each one, and all are confirmed
+        before the chat is switched. A batch only counts as successful (and
+        is recorded in the ledger) once its upload is confirmed; a failed
+        send fails every upload not yet confirmed, as the page reset that
+        follows it cancels them.
+        `on_progress`, if given, is called as each upload is confirmed or fails.
         """
         successful_sends, failed_sends = [], []
-        current_group = None  # State variable to track the active chat
+        current_group = self.active_group  # State variable to track the active chat
+        batches = self._batch_by_group(queue, self.max_files_per_upload)
+        tracker = UploadTracker(
+            self.backend,
+            timeout=UPLOAD_CONFIRM_TIMEOUT_SECONDS,
+            grace=UPLOAD_INDICATOR_GRACE_SECONDS,
+            clock=self.clock,
+            sleep=self.sleep,
+        )
+        items_issued = items_settled = 0
+
+        def finish(batch, sent: bool):
+            nonlocal items_settled
+            items_settled += len(batch)
+            if sent:
+                successful_sends.extend(batch)
+                if self.ledger:
+                    self.ledger.mark_sent(batch)
+            else:
+                failed_sends.extend(batch)
+            self._report_progress(
+                on_progress, batch, sent, items_settled, len(queue), self._eta(queue[items_issued:], current_group)
+            )
+
+        last_confirmed_at: float | None = None
+
+        def confirmed(upload, sent: bool, timed_apart: bool):
+            nonlocal last_confirmed_at
+            batch = upload.batch
+            upload_started, batch_bytes = upload.context["upload_started"], upload.context["batch_bytes"]
+            switched, select_seconds = upload.context["switched"], upload.context["select_seconds"]
+            now = upload.resolved_at
+            target_group = batch[0]["group_name"]
+            # "upload" runs from issuing the send until the upload is confirmed;
+            # "send" below only covers the UI steps that issue it.
+            metrics.record("upload", now - upload_started, group=target_group, files=len(batch), bytes=batch_bytes, ok=sent)
+
+            # Uploads finish one after another: time spent queued behind the
+            # previous upload is not part of this one.
+            started = max(upload_started, last_confirmed_at or upload_started)
+            # Uploads confirmed by the same check cannot be timed apart, so none of them is recorded.
+            if self.history and (timed_apart or not sent):
+                self.history.record(target_group, len(batch), batch_bytes, switched, select_seconds + now - started, sent)
+            last_confirmed_at = now
+            finish(batch, sent)
+
+        def handle(resolved):
+            # Called directly rather than as future callbacks, so a failing
+            # ledger write or progress callback stops the run instead of being lost.
+            confirmed_per_check = Counter(upload.resolved_at for upload, sent in resolved if sent)
+            for upload, sent in resolved:
+                confirmed(upload, sent, confirmed_per_check[upload.resolved_at] == 1)
 
-        for i, item in enumerate(queue):
+        for batch in batches:
             print("-" * 20)
+            target_group = batch[0]["group_name"]
+            file_names = ", ".join(f"'{item['file_path'].name}'" for item in batch)
             logging.info(
-                f"Processing item {i + 1}/{len(queue)}: Send '{item['file_path'].name}' to '{item['group_name']}'"
+                f"Processing item(s) {items_issued + 1}-{items_issued + len(batch)}/{len(queue)}: "
+                f"Send {file_names} to '{target_group}'"
             )
+            items_issued += len(batch)
 
-            target_group = item["group_name"]
+            with metrics.group_scope(target_group), metrics.span("batch", files=len(batch)):
+                # --- State-Aware Logic ---
+                switched = target_group != current_group
+                if switched:
+                    # Pending uploads can only be watched in their own chat.
+                    with metrics.span("confirm_wait"):
+                        handle(tracker.settle())
+                    logging.info(f"Current group is '{current_group}'. Target is '{target_group}'. Switching chats.")
+                    select_started = self.clock()
+                    with metrics.span("select_chat"):
+                        selected = self.backend.select_chat(target_group)
+                    select_seconds = self.clock() - select_started
+                    if selected:
+                        current_group = target_group
+                    else:
+                        logging.error(f"Skipping {len(batch)} file(s) for '{target_group}' as chat could not be selected.")
+                        current_group = None
+                        finish(batch, False)
+                        continue
+                else:
+                    logging.info(f"Target group '{target_group}' is already active. Skipping search.")
+                    select_seconds = 0.0
+
+                # --- Rate Limit ---
+                with metrics.span("rate_limit_wait"):
+                    self.rate_limiter.acquire(target_group)
+                # Uploads may have finished during the wait; noticing them now times them more closely.
+                handle(tracker.poll())
 
-            # --- State-Aware Logic ---
-            if target_group != current_group:
-                logging.info(f"Current group is '{current_group}'. Target is '{target_group}'. Switching chats.")
-                if self.backend.select_chat(target_group):
-                    current_group = target_group
+                # --- Send File(s) ---
+                batch_bytes = sum(item.get("file_size", 0) for item in batch)
+                upload_started = self.clock()
+                with metrics.span("send", files=len(batch), bytes=batch_bytes):
+                    if len(batch) == 1:
+                        sent = self.backend.attach_and_send_file(self._upload_path(batch[0]))
+                    else:
+                        sent = self.backend.attach_and_send_files([self._upload_path(item) for item in batch])
+                if sent:
+                    handle(
+                        tracker.track(
+                            batch,
+                            upload_started=upload_started,
+                            batch_bytes=batch_bytes,
+                            switched=switched,
+                            select_seconds=select_seconds,
+                        )
+                    )
+                    handle(tracker.poll())
                 else:
-                    logging.error(f"Skipping file for '{target_group}' as chat could not be selected.")
-                    failed_sends.append(item)
-                    current_group = None
-                    continue
-            else:
-                logging.info(f"Target group '{target_group}' is already active. Skipping search.")
+                    if self.history:
+                        duration = select_seconds + self.clock() - upload_started
+                        self.history.record(target_group, len(batch), batch_bytes, switched, duration, False)
+                    # The backend resets the page after a failed send, which
+                    # cancels uploads still in progress in this chat.
+                    handle(tracker.abandon())
+                    finish(batch, False)
+                    current_group = None # Reset state on failure to be safe
 
-            # --- Send File ---
-            if self.backend.attach_and_send_file(item["file_path"]):
-                successful_sends.append(item)
-            else:
-                failed_sends.append(item)
-                current_group = None # Reset state on failure to be safe
+        with metrics.span("confirm_wait"):
+            handle(tracker.settle())
+        self.active_group = current_group
+        return successful_sends, failed_sends
+
+    def _eta(self, remaining: List[Dict[str, Any]], current_group: str | None) -> float | None:
+        """Private method to estimate the seconds left for the items not yet sent (None without a model)."""
+        if self.eta_model is None:
+            return None
+        return self.eta_model.estimate_queue(
+            remaining,
+            batch_size=self.max_files_per_upload,
+            min_interval=self.rate_limiter.min_interval,
+            start_group=current_group,
+        )
+
+    @staticmethod
+    def _report_progress(on_progress, batch, sent: bool, done: int, total: int, eta_seconds: float | None = None):
+        """Private method to notify a progress callback about a finished batch."""
+        if on_progress is None:
+            return
+        on_progress({
+            "group_name": batch[0]["group_name"],
+            "files": [item["file_path"].name for item in batch],
+            "sent": sent,
+            "done": done,
+            "total": total,
+            "eta_seconds": eta_seconds,
+        })
+
+    # --- Async API (for asyncio backends such as AsyncPlaywrightSender) ---
+
+    async def initialize_async(self, interactive: bool = True):
+        """Initializes an asyncio backend."""
+        await self.backend.initialize_browser(interactive=interactive)
+
+    async def shutdown_async(self):
+        """Shuts down an asyncio backend."""
+        await self.backend.shutdown_browser()
+
+    async def send_queue_async(self, queue: List[Dict[str, Any]]):
+        """
+        Async counterpart of send_queue that pipelines work across batches:
+        - the next batch's files are checked and read while the current one uploads;
+        - upload completion is confirmed in the background while further files
+          for the same chat are attached, and awaited before leaving the chat.
+        """
+        successful_sends, failed_sends = [], []
+        current_group = None
+        batches = self._batch_by_group(queue, self.max_files_per_upload)
+        pending_confirmations: List[tuple] = []  # (confirm task, batch)
+
+        async def settle_confirmations():
+            for task, confirmed_batch in pending_confirmations:
+                if await task:
+                    successful_sends.extend(confirmed_batch)
+                    if self.ledger:
+                        self.ledger.mark_sent(confirmed_batch)
+                else:
+                    failed_sends.extend(confirmed_batch)
+            pending_confirmations.clear()
+
+        async def confirm(batch, upload_started: float) -> bool:
+            # "upload" runs from issuing the send until the upload is confirmed.
+            sent = await self.backend.confirm_upload()
+            metrics.record(
+                "upload", self.clock() - upload_started, group=batch[0]["group_name"], files=len(batch), ok=sent
+            )
+            return sent
+
+        def prepare(batch):
+            with metrics.group_scope(batch[0]["group_name"]):
+                return asyncio.create_task(self.backend.prepare_files([self._upload_path(item) for item in batch]))
+
+        next_payloads = prepare(batches[0]) if batches else None
+        try:
+            for index, batch in enumerate(batches):
+                target_group = batch[0]["group_name"]
+                payloads_task = next_payloads
+                next_payloads = prepare(batches[index + 1]) if index + 1 < len(batches) else None
+                logging.info(f"Processing batch {index + 1}/{len(batches)}: {len(batch)} file(s) to '{target_group}'")
+
+                with metrics.group_scope(target_group):
+                    try:
+                        with metrics.span("prepare_wait"):
+                            payloads = await payloads_task
+                    except OSError as e:
+                        logging.error(f"Could not read file(s) for '{target_group}', skipping batch. Error: {e}")
+                        failed_sends.extend(batch)
+                        continue
+
+                    if target_group != current_group:
+                        # The confirmation watches the open chat, so finish it before leaving.
+                        with metrics.span("confirm_wait"):
+                            await settle_confirmations()
+                        with metrics.span("select_chat"):
+                            selected = await self.backend.select_chat(target_group)
+                        if selected:
+                            current_group = target_group
+                        else:
+                            failed_sends.extend(batch)
+                            current_group = None
+                            continue
+
+                    with metrics.span("rate_limit_wait"):
+                        await asyncio.to_thread(self.rate_limiter.acquire, target_group)
 
-            if i < len(queue) - 1:
-                wait_seconds = DEFAULT_STAGGER_MINUTES * 60
-                logging.info(f"Waiting for {wait_seconds} seconds...")
-                ic(f"Waiting for {wait_seconds} seconds...")
-                time.sleep(wait_seconds)
+                    upload_started = self.clock()
+                    with metrics.span("send", files=len(batch)):
+                        sent = await self.backend.attach_and_send_files(payloads)
+                    if sent:
+                        pending_confirmations.append((asyncio.create_task(confirm(batch, upload_started)), batch))
+                    else:
+                        failed_sends.extend(batch)
+                        current_group = None
 
-        return successful_sends, failed_sends
\ No newline at end of file
+            await settle_confirmations()
+        finally:
+            # On an error, do not leave the read-ahead or confirmations running.
+            if next_payloads:
+                next_payloads.cancel()
+            for task, _ in pending_confirmations:
+                task.cancel()
+        return successful_sends, failed_sends
@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import mimetypes
+import os
+from pathlib import Path
+from typing import List, Dict, Any
+from playwright.async_api import (
+    async_playwright,
+    Error as PlaywrightError,
+    Playwright,
+    BrowserContext,
+    Page,
+    Locator,
+    TimeoutError as PlaywrightTimeoutError,
+)
+from config import (
+    USER_DATA_DIR,
+    HEADLESS_MODE,
+    PLAYWRIGHT_SELECTORS as SELECTORS,
+    MESSAGE_CAPTION,
+    LATENCY_PROFILE,
+    UPLOAD_CONFIRM_TIMEOUT_SECONDS,
+    SELECTOR_CACHE_PATH,
+)
+from src.core.sender_backends.latency import get_latency_profile
+from src.core.sender_backends.playwright_sender import LOCATE_TIMEOUT_MS, VerificationError
+from src.core.sender_backends.selector_cache import SelectorCache
+from src.utils.metrics import timed
+
+
+# Playwright rejects in-memory file payloads above 50 MB; larger files are passed by path.
+MAX_BUFFER_PAYLOAD_BYTES = 45 * 1024 * 1024
+
+
+class AsyncPlaywrightSender:
+    """
+    An asyncio backend on playwright.async_api.
+
+    Its steps are coroutines, so the facade can overlap them: the next
+    batch's files are checked and read from disk while the current upload
+    runs, and upload completion is confirmed in the background while
+    further files for the same chat are attached.
+    """
+
+    def __init__(self, user_data_dir: str | None = None):
+        # Browser profile directory; separate profiles allow several sessions at once.
+        self.user_data_dir = user_data_dir or USER_DATA_DIR
+        self.playwright: Playwright | None = None
+        self.context: BrowserContext | None = None
+        self.page: Page | None = None
+        self.latency = get_latency_profile(LATENCY_PROFILE)
+        self.selector_cache = SelectorCache(SELECTOR_CACHE_PATH)
+
+    async def _locate(self, selector_key: str, **format_args) -> Locator:
+        """
+        Locates the visible element for a PLAYWRIGHT_SELECTORS key: the cached
+        winner first, then all candidates raced at once (see PlaywrightSender._locate).
+        """
+        if not self.page:
+            raise RuntimeError("Browser is not initialized. Cannot locate elements.")
+
+        templates = SELECTORS[selector_key]
+        preferred = self.selector_cache.preferred(selector_key, templates)
+        if preferred:
+            try:
+                locator = self.page.locator(preferred.format(**format_args))
+                await locator.wait_for(state="visible", timeout=LOCATE_TIMEOUT_MS)
+                self.selector_cache.record_hit(selector_key)
+                return locator
+            except PlaywrightTimeoutError:
+                pass
+
+        candidates = {template: self.page.locator(template.format(**format_args)) for template in templates}
+        race = None
+        for locator in candidates.values():
+            race = locator if race is None else race.or_(locator)
+        try:
+            await race.first.wait_for(state="visible", timeout=LOCATE_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
+            raise PlaywrightTimeoutError(
+                f"Could not find a visible element for any of the selectors for '{selector_key}': {templates}"
+            )
+        for template, locator in candidates.items():
+            if await locator.first.is_visible():
+                self.selector_cache.record_miss(selector_key, template)
+                await asyncio.to_thread(self.selector_cache.save)
+                return locator
+        raise PlaywrightTimeoutError(f"The element for '{selector_key}' is no longer visible.")
+
+    async def initialize_browser(self, interactive: bool = True):
+        """Launches the persistent browser context and waits for WhatsApp Web to log in."""
+        logging.debug("Initializing async browser...")
+        self.playwright = await async_playwright().start()
+        self.context = await self.playwright.chromium.launch_persistent_context(
+            user_data_dir=self.user_data_dir, headless=HEADLESS_MODE, slow_mo=self.latency.slow_mo_ms
+        )
+        self.page = self.context.pages[0]
+        await self.page.goto("https://web.whatsapp.com/")
+        try:
+            await self.page.wait_for_selector(SELECTORS["login_check"][0], timeout=15000)
+            logging.debug("Login successful from saved session!")
+        except PlaywrightTimeoutError:
+            if interactive:
+                print("Please scan the QR code to log in. Waiting up to 2 minutes...")
+            try:
+                await self.page.wait_for_selector(SELECTORS["login_check"][0], timeout=120000)
+            except PlaywrightTimeoutError:
+                logging.error("Timeout: Failed to log into WhatsApp Web within 2 minutes.")
+                raise ConnectionError("Could not log into WhatsApp Web. Please try again.")
+
+    def is_alive(self) -> bool:
+        """Returns True if the browser page is still open."""
+        return self.page is not None and not self.page.is_closed()
+
+    async def shutdown_browser(self):
+        logging.debug("Shutting down async browser...")
+        self.selector_cache.save()
+        logging.info(f"Selector cache statistics: {self.selector_cache.stats()}")
+        if self.context:
+            await self.context.close()
+        if self.playwright:
+            await self.playwright.stop()
+        logging.info("Browser has been shut down.")
+
+    @timed("playwright_async.select_chat")
+    async def select_chat(self, group_name: str) -> bool:
+        """Searches for, opens and verifies a chat. Returns True on success."""
+        try:
+            search_box = await self._locate("search_box")
+            await search_box.evaluate("element => element.innerHTML = ''")
+            await search_box.click()
+            await asyncio.to_thread(self.latency.pause)
+            await search_box.fill(group_name)
+
+            await (await self._locate("search_result_by_name", name=group_name)).click()
+
+            header = await self._locate("chat_header_title")
+            header_text = await header.inner_text()
+            if header_text != group_name:
+                await self.page.keyboard.press("Escape")
+                raise VerificationError(f"Verification Failed! Expected '{group_name}' but found '{header_text}'.")
+            return True
+        except (PlaywrightTimeoutError, VerificationError) as e:
+            logging.error(f"Could not find or open chat '{group_name}'. Error: {e}")
+            return False
+
+    @staticmethod
+    def _read_payload(file_path: Path) -> Dict[str, Any]:
+        return {
+            "name": file_path.name,
+            "mimeType": mimetypes.guess_type(file_path.name)[0] or "application/pdf",
+            "buffer": file_path.read_bytes(),
+        }
+
+    @timed("playwright_async.prepare_files")
+    async def prepare_files(self, file_paths: List[Path]) -> List[Dict[str, Any]] | List[Path]:
+        """
+        Checks and reads files into upload payloads on worker threads, so this
+        can run while another upload is in progress. A batch with a file too
+        large for an in-memory payload is passed as paths instead (Playwright
+        cannot mix the two). Raises FileNotFoundError if a file has disappeared.
+        """
+        sizes = await asyncio.gather(*(asyncio.to_thread(os.path.getsize, p) for p in file_paths))
+        if max(sizes, default=0) > MAX_BUFFER_PAYLOAD_BYTES:
+            return list(file_paths)
+        return list(await asyncio.gather(*(asyncio.to_thread(self._read_payload, p) for p in file_paths)))
+
+    @timed("playwright_async.attach_and_send_files")
+    async def attach_and_send_files(self, payloads: List[Dict[str, Any]] | List[Path]) -> bool:
+        """
+        Attaches the prepared files to the active chat and sends them.
+        Returns once the preview has closed; use confirm_upload for completion.
+        """
+        try:
+            attach_button = await self._locate("attach_button")
+            await attach_button.click()
+            document_button = await self._locate("document_button")
+            async with self.page.expect_file_chooser() as fc_info:
+                await document_button.click()
+            file_chooser = await fc_info.value
+            await file_chooser.set_files(payloads)
+
+            if MESSAGE_CAPTION:
+                caption_box = await self._locate("caption_box")
+                await caption_box.fill(MESSAGE_CAPTION)
+            send_button = await self._locate("send_button")
+            await send_button.click()
+            await send_button.wait_for(state="hidden", timeout=15000)
+            await asyncio.to_thread(self.latency.pause)
+            return True
+        except PlaywrightError as e:  # Includes timeouts.
+            logging.error(f"Could not attach or send file(s). A selector may be invalid. Error: {e}")
+            if self.page:
+                await self.page.keyboard.press("Escape")
+            return False
+
+    @timed("playwright_async.confirm_upload")
+    async def confirm_upload(self) -> bool:
+        """
+        Waits until no outgoing message in the open chat shows the pending
+        (clock) indicator. Returns False if the upload did not finish in time.
+        """
+        try:
+            # Every indicator must be gone, not just the first one to detach.
+            await self.page.wait_for_function(
+                "selector => document.querySelectorAll(selector).length === 0",
+                arg=", ".join(SELECTORS["pending_message"]),
+                timeout=UPLOAD_CONFIRM_TIMEOUT_SECONDS * 1000,
+            )
+            return True
+        except PlaywrightTimeoutError:
+            logging.error("Upload was not confirmed before the timeout.")
+            return False
@@ -0,0 +1,39 @@
+from pathlib import Path
+from typing import List, Protocol, runtime_checkable
+
+
+@runtime_checkable
+class SenderBackend(Protocol):
+    """
+    The interface every browser backend implements, so WhatsAppFileSender
+    can drive any of them. Async backends expose the same methods as
+    coroutines (except is_alive).
+
+    Backends may also implement pending_uploads() -> int and
+    wait_for_uploads(timeout) -> bool, so UploadTracker can confirm when
+    uploads have finished; without them a send counts as done once issued.
+    """
+
+    def initialize_browser(self, interactive: bool = True):
+        """Launches the browser and waits until WhatsApp Web is logged in."""
+        ...
+
+    def shutdown_browser(self):
+        """Closes the browser."""
+        ...
+
+    def is_alive(self) -> bool:
+        """Returns True while the browser session is usable."""
+        ...
+
+    def select_chat(self, group_name: str) -> bool:
+        """Opens the chat for a group. Returns True on success."""
+        ...
+
+    def attach_and_send_file(self, file_path: Path) -> bool:
+        """Sends one file to the active chat. Returns True on success."""
+        ...
+
+    def attach_and_send_files(self, file_paths: List[Path]) -> bool:
+        """Sends several files to the active chat in one action. Returns True on success."""
+        ...
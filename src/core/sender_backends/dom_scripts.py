@@ -0,0 +1,57 @@
+# JavaScript snippets injected into WhatsApp Web by the browser backends.
+
+# Resolves as soon as a selector reaches the requested state, using a
+# MutationObserver instead of polling from Python.
+# Arguments: kind ('css' | 'xpath'), selector, state ('present' | 'absent' |
+# 'text'), expected text (for 'text'), timeout in ms, async callback.
+# Calls back with true when the state is reached, false on timeout.
+WAIT_FOR_SELECTOR_JS = """
+const [kind, selector, state, expectedText, timeoutMs, done] = arguments;
+const find = () => kind === 'css'
+    ? document.querySelector(selector)
+    : document.evaluate(selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const satisfied = () => {
+    const element = find();
+    if (state === 'absent') return !element;
+    if (state === 'text') return !!element && element.textContent.toLowerCase().includes(expectedText.toLowerCase());
+    return !!element;
+};
+if (satisfied()) { done(true); return; }
+let timer = null;
+const observer = new MutationObserver(() => {
+    if (satisfied()) { observer.disconnect(); clearTimeout(timer); done(true); }
+});
+timer = setTimeout(() => { observer.disconnect(); done(false); }, timeoutMs);
+observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+"""
+
+# Maintains a name -> sidebar-entry index of the loaded chats in
+# window.__wfdChatIndex, kept up to date by a MutationObserver on the chat
+# list, and returns the entry for arguments[0] (or null). The index is
+# (re)installed on first use, e.g. after a page reload.
+CHAT_INDEX_LOOKUP_JS = """
+const name = arguments[0];
+const pane = document.querySelector('#pane-side');
+if (!pane) return null;
+if (!window.__wfdChatIndex || window.__wfdChatIndexPane !== pane) {
+    const rebuild = () => {
+        const index = new Map();
+        for (const title of pane.querySelectorAll('span[title]')) {
+            const entry = title.closest('[role="listitem"], [role="row"]') || title;
+            if (!index.has(title.title)) index.set(title.title, entry);
+        }
+        window.__wfdChatIndex = index;
+    };
+    rebuild();
+    let scheduled = false;
+    new MutationObserver(() => {
+        if (scheduled) return;
+        scheduled = true;
+        setTimeout(() => { scheduled = false; rebuild(); }, 50);
+    }).observe(pane, {childList: true, subtree: true, attributes: true, attributeFilter: ['title']});
+    window.__wfdChatIndexPane = pane;
+}
+if (name === null) return window.__wfdChatIndex.size;
+const entry = window.__wfdChatIndex.get(name);
+return entry && entry.isConnected ? entry : null;
+"""
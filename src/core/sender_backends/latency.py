@@ -0,0 +1,42 @@
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    """
+    Optional pacing applied on top of the condition-based waits.
+
+    - `step_pause`: (min, max) seconds of random pause after each UI step.
+    - `slow_mo_ms`: Playwright's slow_mo, applied to every browser operation.
+    """
+
+    name: str
+    step_pause: Tuple[float, float] = (0.0, 0.0)
+    slow_mo_ms: int = 0
+
+    def pause(self):
+        """Sleeps for a random step pause (returns immediately for the 'fast' profile)."""
+        low, high = self.step_pause
+        if high > 0:
+            time.sleep(random.uniform(low, high))
+
+
+LATENCY_PROFILES: Dict[str, LatencyProfile] = {
+    # Every step ends as soon as the page reaches the expected state.
+    "fast": LatencyProfile("fast"),
+    # Human-like pacing, close to the old fixed sleeps and slow_mo=500.
+    "human": LatencyProfile("human", step_pause=(0.5, 1.5), slow_mo_ms=500),
+}
+
+
+def get_latency_profile(name: str) -> LatencyProfile:
+    """Looks up a latency profile by name."""
+    try:
+        return LATENCY_PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown latency profile '{name}'. Options: {', '.join(LATENCY_PROFILES)}"
+        )
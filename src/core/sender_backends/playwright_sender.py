@@ -1,9 +1,7 @@
 import logging
-import random
 import time
 from pathlib import Path
 from typing import List
-from icecream import ic
 from playwright.sync_api import (
     sync_playwright,
     Playwright,
@@ -12,12 +10,25 @@ from playwright.sync_api import (
     Locator,
     TimeoutError as PlaywrightTimeoutError,
 )
-from config import USER_DATA_DIR, HEADLESS_MODE, SELECTORS, MESSAGE_CAPTION
+from config import (
+    USER_DATA_DIR,
+    HEADLESS_MODE,
+    PLAYWRIGHT_SELECTORS as SELECTORS,
+    MESSAGE_CAPTION,
+    LATENCY_PROFILE,
+    SELECTOR_CACHE_PATH,
+)
+from src.core.sender_backends.latency import get_latency_profile
+from src.core.sender_backends.selector_cache import SelectorCache
+from src.utils.metrics import timed
 
 
 # A new, stable selector for the main side panel
 PANE_SIDE_SELECTOR = "div[data-testid='pane-side']"
 
+# How long an element lookup waits for a selector to become visible.
+LOCATE_TIMEOUT_MS = 3000
+
 
 class VerificationError(Exception):
     """Custom exception for when chat header verification fails."""
@@ -32,50 +43,82 @@ class SendError(Exception):
 
 
 class PlaywrightSender:
-    def __init__(self):
+    def __init__(self, user_data_dir: str | None = None):
+        # Browser profile directory; separate profiles allow several sessions at once.
+        self.user_data_dir = user_data_dir or USER_DATA_DIR
         self.playwright: Playwright | None = None
         self.context: BrowserContext | None = None
         self.page: Page | None = None
-        ic("PlaywrightSender object created.")
+        self.latency = get_latency_profile(LATENCY_PROFILE)
+        self.selector_cache = SelectorCache(SELECTOR_CACHE_PATH)
+        logging.debug("PlaywrightSender object created.")
 
-    def _locate_with_fallback(self, selector_keys: List[str]) -> Locator:
+    def _locate(self, selector_key: str, **format_args) -> Locator:
+        """
+        Locates the visible element for a SELECTORS key. The selector that
+        worked last time is tried first; on a miss, every candidate is raced
+        at once and the winner is remembered for next time.
+        """
         # --- NEW: Precondition Check ---
         if not self.page:
             raise RuntimeError("Browser is not initialized. Cannot locate elements.")
 
-        for selector in selector_keys:
+        templates = SELECTORS[selector_key]
+        preferred = self.selector_cache.preferred(selector_key, templates)
+        if preferred:
             try:
-                locator = self.page.locator(selector)
-                locator.wait_for(state="visible", timeout=3000)
+                locator = self.page.locator(preferred.format(**format_args))
+                locator.wait_for(state="visible", timeout=LOCATE_TIMEOUT_MS)
+                self.selector_cache.record_hit(selector_key)
                 return locator
             except PlaywrightTimeoutError:
-                continue
-        raise PlaywrightTimeoutError(
-            f"Could not find a visible element for any of the provided selectors: {selector_keys}"
-        )
+                pass
+
+        # --- Cache miss: race all candidates at once ---
+        candidates = {template: self.page.locator(template.format(**format_args)) for template in templates}
+        race = None
+        for locator in candidates.values():
+            race = locator if race is None else race.or_(locator)
+        try:
+            race.first.wait_for(state="visible", timeout=LOCATE_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
+            raise PlaywrightTimeoutError(
+                f"Could not find a visible element for any of the selectors for '{selector_key}': {templates}"
+            )
+        for template, locator in candidates.items():
+            if locator.first.is_visible():
+                self.selector_cache.record_miss(selector_key, template)
+                self.selector_cache.save()
+                return locator
+        # The element disappeared between the race and the check.
+        raise PlaywrightTimeoutError(f"The element for '{selector_key}' is no longer visible.")
+
+    def selector_stats(self):
+        """Returns the selector cache's hit/miss statistics."""
+        return self.selector_cache.stats()
 
-    # ... (initialize_browser and shutdown_browser are unchanged) ...
-    def initialize_browser(self):
-        ic("Initializing browser...")
+    def initialize_browser(self, interactive: bool = True):
+        logging.debug("Initializing browser...")
         self.playwright = sync_playwright().start()
         self.context = self.playwright.chromium.launch_persistent_context(
-            user_data_dir=USER_DATA_DIR, headless=HEADLESS_MODE, slow_mo=500
+            user_data_dir=self.user_data_dir, headless=HEADLESS_MODE, slow_mo=self.latency.slow_mo_ms
         )
         self.page = self.context.pages[0]
-        ic("Navigating to WhatsApp Web...")
+        logging.debug("Navigating to WhatsApp Web...")
         self.page.goto("https://web.whatsapp.com/")
         try:
-            ic("Checking for existing login session...")
+            logging.debug("Checking for existing login session...")
             self.page.wait_for_selector(SELECTORS["login_check"][0], timeout=15000)
             print("✅ Login successful from saved session!")
-            ic("Login successful from saved session!")
+            logging.debug("Login successful from saved session!")
         except PlaywrightTimeoutError:
-            print("Please scan the QR code to log in. Waiting up to 2 minutes...")
-            ic("Waiting for QR code scan...")
+            if interactive:
+                print("Please scan the QR code to log in. Waiting up to 2 minutes...")
+            logging.debug("Waiting for QR code scan...")
             try:
                 self.page.wait_for_selector(SELECTORS["login_check"][0], timeout=120000)
                 print("✅ QR code scanned. Login successful!")
-                ic("QR code scanned. Login successful!")
+                logging.debug("QR code scanned. Login successful!")
             except PlaywrightTimeoutError:
                 logging.error(
                     "Timeout: Failed to log into WhatsApp Web within 2 minutes."
@@ -84,78 +127,128 @@ class PlaywrightSender:
                     "Could not log into WhatsApp Web. Please try again."
                 )
 
+    def is_alive(self) -> bool:
+        """Returns True if the browser page is still open."""
+        return self.page is not None and not self.page.is_closed()
+
     def shutdown_browser(self):
-        ic("Shutting down browser...")
+        logging.debug("Shutting down browser...")
+        self.selector_cache.save()
+        logging.info(f"Selector cache statistics: {self.selector_cache.stats()}")
         if self.context:
             self.context.close()
         if self.playwright:
             self.playwright.stop()
         logging.info("Browser has been shut down.")
 
+    @timed("playwright.navigate_to_group")
     def _navigate_to_group(self, group_name: str):
         """Finds, opens, and verifies the chat for a specific group."""
         # --- NEW: Precondition Check ---
         if not self.page:
             raise RuntimeError("Browser is not initialized. Cannot navigate.")
 
-        ic(f"Navigating to group: '{group_name}'")
-        search_box = self._locate_with_fallback(SELECTORS["search_box"])
+        logging.debug("Navigating to group: '%s'", group_name)
+        search_box = self._locate("search_box")
         search_box.evaluate("element => element.innerHTML = ''")
         search_box.click()
-        time.sleep(random.uniform(0.5, 1.0))
+        self.latency.pause()
         search_box.fill(group_name)
 
-        result_selectors = [
-            s.format(name=group_name) for s in SELECTORS["search_result_by_name"]
-        ]
-        search_result_locator = self._locate_with_fallback(result_selectors)
+        search_result_locator = self._locate("search_result_by_name", name=group_name)
         search_result_locator.click()
 
-        ic("Verifying chat header...")
-        header = self._locate_with_fallback(SELECTORS["chat_header_title"])
+        logging.debug("Verifying chat header...")
+        header = self._locate("chat_header_title")
         header_text = header.inner_text()
         if header_text != group_name:
             error_msg = f"Verification Failed! Expected '{group_name}' but found '{header_text}'."
             self.page.keyboard.press("Escape")
             raise VerificationError(error_msg)
-        ic(f"✅ Header verified for '{group_name}'.")
+        logging.debug("Header verified for '%s'.", group_name)
 
-    def _attach_file(self, file_path: Path):
-        """Attaches a file to the message compose box."""
+    @timed("playwright.attach_file")
+    def _attach_file(self, file_path: Path | List[Path]):
+        """Attaches one file (or several, in one action) to the message compose box."""
         # --- NEW: Precondition Check ---
         if not self.page:
             raise RuntimeError("Browser is not initialized. Cannot attach file.")
 
-        ic(f"Attaching file: {file_path.name}")
-        attach_button = self._locate_with_fallback(SELECTORS["attach_button"])
+        logging.debug("Attaching file(s): %s", file_path)
+        attach_button = self._locate("attach_button")
         attach_button.click()
-        document_button = self._locate_with_fallback(SELECTORS["document_button"])
+        document_button = self._locate("document_button")
         with self.page.expect_file_chooser() as fc_info:
             document_button.click()
         file_chooser = fc_info.value
         file_chooser.set_files(file_path)
 
+    @timed("playwright.add_caption_and_send")
     def _add_caption_and_send(self):
         """Adds a caption and clicks the final send button."""
         # --- NEW: Precondition Check ---
         if not self.page:
             raise RuntimeError("Browser is not initialized. Cannot send message.")
 
-        ic("Adding caption and sending...")
-        caption_box = self._locate_with_fallback(SELECTORS["caption_box"])
+        logging.debug("Adding caption and sending...")
+        caption_box = self._locate("caption_box")
         caption_box.fill(MESSAGE_CAPTION)
-        send_button = self._locate_with_fallback(SELECTORS["send_button"])
+        send_button = self._locate("send_button")
         send_button.click()
         send_button.wait_for(state="hidden", timeout=15000)
-        ic("✅ File sent successfully.")
+        logging.debug("File sent successfully.")
+
+    # --- SenderBackend protocol ---
+
+    @timed("playwright.select_chat")
+    def select_chat(self, group_name: str) -> bool:
+        """Opens and verifies the chat for a group. Returns True on success."""
+        try:
+            self._navigate_to_group(group_name)
+            return True
+        except (PlaywrightTimeoutError, VerificationError) as e:
+            logging.error(f"Could not find or open chat '{group_name}'. Error: {e}")
+            return False
+
+    def pending_uploads(self) -> int:
+        """Returns how many outgoing messages in the open chat are still uploading."""
+        return self.page.locator(", ".join(SELECTORS["pending_message"])).count()
+
+    def wait_for_uploads(self, timeout: float) -> bool:
+        """Waits until no message in the open chat is uploading. Returns False on timeout."""
+        try:
+            # Every indicator must be gone, not just the first one to detach.
+            self.page.wait_for_function(
+                "selector => document.querySelectorAll(selector).length === 0",
+                arg=", ".join(SELECTORS["pending_message"]),
+                timeout=max(1, timeout * 1000),  # 0 would mean no timeout
+            )
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    def attach_and_send_file(self, file_path: Path) -> bool:
+        """Attaches and sends a file to the currently active chat. Returns True on success."""
+        return self.attach_and_send_files([file_path])
+
+    @timed("playwright.attach_and_send_files")
+    def attach_and_send_files(self, file_paths: List[Path]) -> bool:
+        """Attaches several files in one action and sends them. Returns True on success."""
+        try:
+            self._attach_file(file_paths)
+            self._add_caption_and_send()
+            return True
+        except PlaywrightTimeoutError as e:
+            logging.error(f"Could not attach or send file(s). A selector may be invalid. Error: {e}")
+            if self.page:
+                self.page.keyboard.press("Escape")
+            return False
 
     def send_file(self, file_path: Path, group_name: str, hour: int, minute: int):
         # ... (This method is unchanged, as it calls the others which now have checks) ...
         for attempt in range(2):
             try:
-                ic(
-                    f"Attempt {attempt + 1}/2 to send '{file_path.name}' to '{group_name}'"
-                )
+                logging.debug("Attempt %d/2 to send '%s' to '%s'", attempt + 1, file_path.name, group_name)
                 self._navigate_to_group(group_name)
                 self._attach_file(file_path)
                 self._add_caption_and_send()
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from typing import List
+
+from src.core.sender_backends.base import SenderBackend
+from src.core.sender_backends.registry import create_backend
+
+
+class BackendPool:
+    """
+    Keeps initialized, logged-in backends alive and hands them out to
+    successive jobs in the same process, so the browser launch and login
+    are paid once rather than per send_queue call.
+    """
+
+    def __init__(self, backend_name: str, size: int = 1, interactive: bool = True):
+        self.backend_name = backend_name
+        self.size = size
+        self.interactive = interactive
+        self._idle: List[SenderBackend] = []
+        self._created = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> SenderBackend:
+        """
+        Returns a warm backend, launching a new one if the pool is not yet full.
+        Blocks while every backend is in use.
+        """
+        with self._condition:
+            while True:
+                while self._idle:
+                    backend = self._idle.pop()
+                    if backend.is_alive():
+                        logging.info(f"Reusing warm '{self.backend_name}' backend from the pool.")
+                        return backend
+                    logging.warning("Discarding a pooled backend whose browser is no longer alive.")
+                    self._discard(backend)
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                self._condition.wait()
+
+        # Launch outside the lock: browser start-up and login can take a while.
+        try:
+            backend = create_backend(self.backend_name)
+            if asyncio.iscoroutinefunction(backend.initialize_browser):
+                raise TypeError(f"BackendPool only supports synchronous backends, not '{self.backend_name}'.")
+            backend.initialize_browser(interactive=self.interactive)
+            return backend
+        except BaseException:
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, backend: SenderBackend):
+        """Returns a backend to the pool for the next job."""
+        with self._condition:
+            if backend.is_alive():
+                self._idle.append(backend)
+            else:
+                self._discard(backend)
+            self._condition.notify()
+
+    @contextmanager
+    def lease(self):
+        """Context manager that acquires a backend and always releases it."""
+        backend = self.acquire()
+        try:
+            yield backend
+        finally:
+            self.release(backend)
+
+    def _discard(self, backend: SenderBackend):
+        self._created -= 1
+        try:
+            backend.shutdown_browser()
+        except Exception as e:
+            logging.warning(f"Error while shutting down a discarded backend: {e}")
+
+    def shutdown(self):
+        """Shuts down every idle backend."""
+        with self._condition:
+            while self._idle:
+                self._discard(self._idle.pop())
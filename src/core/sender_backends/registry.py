@@ -0,0 +1,44 @@
+import importlib
+from typing import Callable, Dict
+
+from src.core.sender_backends.base import SenderBackend
+
+# Backends are registered by import path so that only the selected one's
+# browser library (selenium or playwright) has to be installed.
+_BACKENDS: Dict[str, str | Callable[[], SenderBackend]] = {
+    "selenium": "src.core.sender_backends.selenium_sender:SeleniumSender",
+    "playwright": "src.core.sender_backends.playwright_sender:PlaywrightSender",
+    "playwright-async": "src.core.sender_backends.async_playwright_sender:AsyncPlaywrightSender",
+}
+
+
+def register_backend(name: str, factory: str | Callable[[], SenderBackend]):
+    """Registers a backend under a name, as a 'module:Class' path or a factory callable."""
+    _BACKENDS[name] = factory
+
+
+def available_backends() -> list[str]:
+    """Returns the names of all registered backends."""
+    return list(_BACKENDS)
+
+
+def backend_factory(name: str) -> Callable[..., SenderBackend]:
+    """Returns the class (or factory) registered under a name, without creating a backend."""
+    try:
+        factory = _BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown backend '{name}'. Options: {', '.join(_BACKENDS)}")
+
+    if isinstance(factory, str):
+        module_path, class_name = factory.split(":")
+        try:
+            module = importlib.import_module(module_path)
+        except ImportError as e:
+            raise ImportError(f"Backend '{name}' needs a package that is not installed: {e}") from e
+        factory = getattr(module, class_name)
+    return factory
+
+
+def create_backend(name: str, **options) -> SenderBackend:
+    """Creates a new (uninitialized) backend by name, passing `options` (e.g. user_data_dir) to it."""
+    return backend_factory(name)(**options)
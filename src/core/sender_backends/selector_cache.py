@@ -0,0 +1,83 @@
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+class SelectorCache:
+    """
+    Remembers which candidate selector last worked for each SELECTORS key
+    and persists it across runs, so it can be tried first next time.
+    Also counts hits, misses and wins per selector, so dead candidates can
+    be pruned from config.
+    """
+
+    def __init__(self, cache_path: str | Path):
+        self.cache_path = Path(cache_path)
+        self._lock = threading.Lock()
+        self._winners: Dict[str, str] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self):
+        """Private method to read the cache file (a missing or corrupt file starts empty)."""
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            self._winners = data.get("winners", {})
+            self._stats = data.get("stats", {})
+        except FileNotFoundError:
+            pass
+        except (ValueError, OSError) as e:
+            logging.warning(f"Ignoring unreadable selector cache '{self.cache_path}': {e}")
+
+    def save(self):
+        """Writes the cache to disk."""
+        with self._lock:
+            # Serialized under the lock: record_*() may change the dicts at any time.
+            text = json.dumps({"winners": self._winners, "stats": self._stats}, indent=2)
+        try:
+            tmp_path = self.cache_path.with_suffix(self.cache_path.suffix + ".tmp")
+            tmp_path.write_text(text, encoding="utf-8")
+            tmp_path.replace(self.cache_path)
+        except OSError as e:
+            logging.warning(f"Could not save selector cache '{self.cache_path}': {e}")
+
+    def preferred(self, key: str, candidates: List[str]) -> str | None:
+        """Returns the remembered selector for a key, if it is still one of the candidates."""
+        winner = self._winners.get(key)
+        return winner if winner in candidates else None
+
+    def _key_stats(self, key: str) -> Dict[str, Any]:
+        return self._stats.setdefault(key, {"hits": 0, "misses": 0, "wins": {}})
+
+    def record_hit(self, key: str):
+        """Records that the remembered selector worked."""
+        with self._lock:
+            key_stats = self._key_stats(key)
+            key_stats["hits"] += 1
+            key_stats["wins"][self._winners[key]] = key_stats["wins"].get(self._winners[key], 0) + 1
+
+    def record_miss(self, key: str, winner: str):
+        """Records a lookup that had to race the candidates, and remembers the winner."""
+        with self._lock:
+            key_stats = self._key_stats(key)
+            key_stats["misses"] += 1
+            key_stats["wins"][winner] = key_stats["wins"].get(winner, 0) + 1
+            self._winners[key] = winner
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Returns hit/miss counts and per-selector wins for every key."""
+        with self._lock:
+            return json.loads(json.dumps(self._stats))
+
+    def dead_selectors(self, selectors: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """Returns, per key, the candidates that have never won a lookup."""
+        dead = {}
+        for key, candidates in selectors.items():
+            wins = self._stats.get(key, {}).get("wins", {})
+            if wins:
+                never_won = [c for c in candidates if c not in wins]
+                if never_won:
+                    dead[key] = never_won
+        return dead
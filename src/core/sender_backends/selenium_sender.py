@@ -1,52 +1,133 @@
 import logging
-import time
 from pathlib import Path
+from typing import List
 
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from icecream import ic
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 
-from config import USER_DATA_DIR, HEADLESS_MODE, SELECTORS, MESSAGE_CAPTION
+from config import (
+    USER_DATA_DIR,
+    HEADLESS_MODE,
+    SELECTORS,
+    MESSAGE_CAPTION,
+    LOGIN_TIMEOUT_SECONDS,
+    LATENCY_PROFILE,
+)
+from src.core.sender_backends.dom_scripts import WAIT_FOR_SELECTOR_JS, CHAT_INDEX_LOOKUP_JS
+from src.core.sender_backends.latency import get_latency_profile
+from src.utils.metrics import timed
+
+# Default timeout (seconds) for the condition-based waits below.
+DOM_WAIT_TIMEOUT = 30
 
 
 class SeleniumSender:
-    def __init__(self):
+    def __init__(self, user_data_dir: str | None = None):
+        # Browser profile directory; separate profiles allow several sessions at once.
+        self.user_data_dir = user_data_dir or USER_DATA_DIR
         self.driver: webdriver.Chrome | None = None
         self.wait: WebDriverWait | None = None
+        self.latency = get_latency_profile(LATENCY_PROFILE)
+
+    def _wait_for_dom(
+        self, selector_key: str, state: str = "present", text: str = "", timeout: float = DOM_WAIT_TIMEOUT
+    ):
+        """
+        Blocks until the element for a SELECTORS key reaches `state`
+        ('present', 'absent' or 'text'), signalled by a MutationObserver in the page.
+        Raises TimeoutException if it does not happen within `timeout` seconds.
+        """
+        kind, selector = SELECTORS[selector_key]
+        self.driver.set_script_timeout(timeout + 5)
+        reached = self.driver.execute_async_script(
+            WAIT_FOR_SELECTOR_JS, kind, selector, state, text, int(timeout * 1000)
+        )
+        if not reached:
+            raise TimeoutException(f"'{selector_key}' did not become {state} within {timeout}s.")
 
-    def initialize_browser(self):
-        ic("Initializing Selenium browser...")
+    def initialize_browser(self, interactive: bool = True):
+        """
+        Launches Chrome, opens WhatsApp Web and polls for the chat list until
+        the session is logged in (up to LOGIN_TIMEOUT_SECONDS), so no key
+        press is needed. In interactive mode the user is told to scan the
+        QR code if one is shown.
+        """
+        logging.debug("Initializing Selenium browser...")
         options = webdriver.ChromeOptions()
-        options.add_argument(f"user-data-dir={Path(USER_DATA_DIR).resolve()}")
+        options.add_argument(f"user-data-dir={Path(self.user_data_dir).resolve()}")
         if HEADLESS_MODE:
             options.add_argument("--headless=new")
         service = Service()
         self.driver = webdriver.Chrome(service=service, options=options)
         self.wait = WebDriverWait(self.driver, 30)
         self.driver.get("https://web.whatsapp.com")
-        print(
-            "\n"
-            + "=" * 50
-            + "\n--- ACTION REQUIRED ---\nBrowser has been launched. Please log in to WhatsApp Web."
-        )
-        input("===> Once your chats are visible, press Enter in this terminal...")
-        ic("Waiting for chat list to load...")
+        if interactive:
+            print(
+                "\nBrowser launched. If WhatsApp Web shows a QR code, scan it to log in "
+                f"(waiting up to {LOGIN_TIMEOUT_SECONDS}s)."
+            )
         search_box_by, search_box_selector = SELECTORS["search_box"]
         by = By.CSS_SELECTOR if search_box_by == "css" else By.XPATH
-        self.wait.until(EC.presence_of_element_located((by, search_box_selector)))
-        ic("WhatsApp login confirmed.")
+        logging.info(f"Waiting up to {LOGIN_TIMEOUT_SECONDS}s for WhatsApp Web to be logged in...")
+        try:
+            WebDriverWait(self.driver, LOGIN_TIMEOUT_SECONDS, poll_frequency=0.25).until(
+                EC.presence_of_element_located((by, search_box_selector))
+            )
+        except TimeoutException:
+            raise ConnectionError(
+                "Could not detect a logged-in WhatsApp Web session. "
+                "Scan the QR code within the login timeout and try again."
+            )
+        logging.debug("WhatsApp login confirmed.")
+        indexed = self.driver.execute_script(CHAT_INDEX_LOOKUP_JS, None)
+        logging.info(f"Indexed {indexed or 0} chat(s) from the sidebar.")
+
+    def is_alive(self) -> bool:
+        """Returns True if the browser window still responds."""
+        if not self.driver:
+            return False
+        try:
+            self.driver.current_url
+            return True
+        except WebDriverException:
+            return False
 
     def shutdown_browser(self):
-        ic("Shutting down browser...")
+        logging.debug("Shutting down browser...")
         if self.driver:
             self.driver.quit()
 
+    @timed("selenium.open_from_index")
+    def _open_from_index(self, group_name: str) -> bool:
+        """
+        Private method to open a chat by clicking its entry in the sidebar
+        index, without typing a search. Returns False if the chat is not
+        loaded in the sidebar or did not open.
+        """
+        try:
+            entry = self.driver.execute_script(CHAT_INDEX_LOOKUP_JS, group_name)
+            if entry is None:
+                return False
+            entry.click()
+            self._wait_for_dom("chat_header", state="text", text=group_name, timeout=5)
+            logging.debug("Opened '%s' from the sidebar index.", group_name)
+            return True
+        except WebDriverException as e:
+            logging.info(f"Sidebar index could not open '{group_name}', falling back to search. ({e})")
+            return False
+
+    @timed("selenium.select_chat")
     def select_chat(self, group_name: str) -> bool:
-        """Searches for and opens a specific chat. Returns True on success."""
+        """
+        Opens a specific chat, directly from the sidebar index when it is
+        loaded there, otherwise by searching for it. Returns True on success.
+        """
+        if self._open_from_index(group_name):
+            return True
         try:
             # --- Select Chat ---
             search_by_str, search_selector = SELECTORS["search_box"]
@@ -57,7 +138,9 @@ class SeleniumSender:
             self.driver.execute_script("arguments[0].innerHTML = '';", search_box)
             search_box.click()
             search_box.send_keys(group_name)
-            time.sleep(1.5)
+            # Wait until the search results have been filtered to this group.
+            self._wait_for_dom("search_result_by_name", state="text", text=group_name)
+            self.latency.pause()
             result_by_str, result_selector = SELECTORS["search_result_by_name"]
             by = By.CSS_SELECTOR if result_by_str == "css" else By.XPATH
             self.wait.until(EC.element_to_be_clickable((by, result_selector))).click()
@@ -67,25 +150,50 @@ class SeleniumSender:
             self.driver.get("https://web.whatsapp.com")  # Reset state on failure
             return False
 
+    def pending_uploads(self) -> int:
+        """Returns how many outgoing messages in the open chat are still uploading."""
+        kind, selector = SELECTORS["pending_message"]
+        by = By.CSS_SELECTOR if kind == "css" else By.XPATH
+        return len(self.driver.find_elements(by, selector))
+
+    def wait_for_uploads(self, timeout: float) -> bool:
+        """Waits until no message in the open chat is uploading. Returns False on timeout."""
+        try:
+            self._wait_for_dom("pending_message", state="absent", timeout=timeout)
+            return True
+        except TimeoutException:
+            return False
+
     def attach_and_send_file(self, file_path: Path) -> bool:
         """Attaches and sends a file to the currently active chat. Returns True on success."""
+        return self.attach_and_send_files([file_path])
+
+    @timed("selenium.attach_and_send_files")
+    def attach_and_send_files(self, file_paths: List[Path]) -> bool:
+        """
+        Attaches several files to the currently active chat in one upload action
+        and sends them together. Returns True on success.
+        """
         try:
 
             # Step 3: Click attach button
-            ic(f"Preparing to send '{file_path.name}'...")
+            logging.debug("Preparing to send %s...", file_paths)
             attach_by_str, attach_selector = SELECTORS["attach_button"]
             by = By.CSS_SELECTOR if attach_by_str == "css" else By.XPATH
             self.wait.until(EC.element_to_be_clickable((by, attach_selector))).click()
-            time.sleep(1)
-            
+            self._wait_for_dom("file_input")
+            self.latency.pause()
+
             # --- Direct File Attachment and Send ---
-            ic(f"Attaching '{file_path.name}' to active chat...")
+            # The file input accepts several newline-separated paths at once.
+            logging.debug("Attaching %d file(s) to active chat...", len(file_paths))
             file_input_by_str, file_input_selector = SELECTORS["file_input"]
             by = By.CSS_SELECTOR if file_input_by_str == "css" else By.XPATH
             self.driver.find_element(by, file_input_selector).send_keys(
-                str(file_path.resolve())
+                "\n".join(str(p.resolve()) for p in file_paths)
             )
-            time.sleep(2)  # Wait for the file to be processed
+            self._wait_for_dom("send_button")  # The preview is ready once the send button appears
+            self.latency.pause()
             # caption_by_str, caption_selector = SELECTORS["caption_box"]
             # by = By.CSS_SELECTOR if caption_by_str == "css" else By.XPATH
             # caption_box = self.wait.until(
@@ -96,13 +204,14 @@ class SeleniumSender:
             send_by_str, send_selector = SELECTORS["send_button"]
             by = By.CSS_SELECTOR if send_by_str == "css" else By.XPATH
             self.wait.until(EC.element_to_be_clickable((by, send_selector))).click()
-            time.sleep(1)  # Ensure the send action is processed
+            self._wait_for_dom("send_button", state="absent")  # The preview closes once the send is accepted
+            self.latency.pause()
 
-            ic(f"✅ Send command issued for '{file_path.name}'")
+            logging.debug("Send command issued for %d file(s).", len(file_paths))
             return True
         except (TimeoutException, NoSuchElementException) as e:
             logging.error(
-                f"Could not attach or send file. A selector may be invalid. Error: {e}"
+                f"Could not attach or send file(s). A selector may be invalid. Error: {e}"
             )
             self.driver.get("https://web.whatsapp.com")  # Reset state on failure
             return False
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import multiprocessing
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.managers import BaseManager, BaseProxy
+from pathlib import Path
+from typing import List, Dict, Any, Tuple
+
+from src.core.rate_limiter import RateLimiter
+from src.core.sender_backends.registry import backend_factory, create_backend
+from src.utils.metrics import metrics
+from config import RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST, GROUP_RATE_LIMIT_PER_MINUTE, GROUP_RATE_LIMIT_BURST
+
+
+class _SharedRateLimiter(RateLimiter):
+    """The RateLimiter hosted by the manager, with min_interval readable through a method call."""
+
+    def get_min_interval(self) -> float:
+        return self.min_interval
+
+
+class _RateLimiterProxy(BaseProxy):
+    """A RateLimiter living in the manager process, shared by the shards of one account."""
+
+    _exposed_ = ("acquire", "get_min_interval")
+
+    def acquire(self, group_name: str, tokens: float = 1) -> float:
+        return self._callmethod("acquire", (group_name, tokens))
+
+    @property
+    def min_interval(self) -> float:
+        return self._callmethod("get_min_interval")
+
+
+class _LimiterManager(BaseManager):
+    pass
+
+
+_LimiterManager.register("RateLimiter", _SharedRateLimiter, proxytype=_RateLimiterProxy)
+
+
+def shard_for_group(group_name: str, shard_count: int) -> int:
+    """
+    Returns the shard that sends to `group_name`. The mapping is stable
+    across runs and processes (unlike hash()), so a group always goes to
+    the same worker and profile.
+    """
+    return zlib.crc32(group_name.encode("utf-8")) % shard_count
+
+
+def shard_profile_dirs(base_dir: str, shard_count: int) -> List[str]:
+    """Profile directories for the shards: the usual one first, then '<base_dir>_shard<n>'."""
+    return [base_dir] + [f"{base_dir}_shard{n}" for n in range(1, shard_count)]
+
+
+def _shard_file(path: str | Path, shard_index: int) -> Path:
+    """'<dir>/<name>.<ext>' -> '<dir>/<name>.shard<n>.<ext>', so each worker writes its own file."""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.shard{shard_index}{path.suffix}")
+
+
+def _send_shard(
+    shard_index: int,
+    backend_name: str,
+    user_data_dir: str,
+    queue: List[Dict[str, Any]],
+    ledger_path: str | None,
+    interactive: bool,
+    log_level: str,
+    metrics_path: str | None,
+    rate_limiter: _RateLimiterProxy,
+) -> Tuple[List[int], List[int]]:
+    """
+    Sends one shard's queue in a worker process with its own browser profile,
+    paced by its account's shared `rate_limiter`.
+    Returns the positions (in `queue`) of the successful and failed items.
+    """
+    # Imported here: the worker runs in a freshly spawned interpreter.
+    from src.core.ledger import SendLedger
+    from src.core.sender import WhatsAppFileSender
+    from src.utils.logger import setup_logging
+    from config import LOG_FILE
+
+    setup_logging(level=log_level, log_file=str(_shard_file(LOG_FILE, shard_index)))
+    if metrics_path:
+        metrics.open(_shard_file(metrics_path, shard_index))
+    for position, item in enumerate(queue):
+        item["_shard_position"] = position
+
+    ledger = SendLedger(ledger_path) if ledger_path else None
+    sender = WhatsAppFileSender(
+        backend=create_backend(backend_name, user_data_dir=user_data_dir), rate_limiter=rate_limiter, ledger=ledger
+    )
+    try:
+        if interactive:
+            print(f"[shard {shard_index}] Starting browser with profile '{user_data_dir}'...")
+        sender.initialize(interactive=interactive)
+        successful, failed = sender.send_queue(queue)
+    except Exception as e:
+        logging.critical(f"Shard {shard_index} failed: {e}")
+        return [], list(range(len(queue)))
+    finally:
+        sender.shutdown()
+        if ledger:
+            ledger.close()
+        metrics.close()
+    successful_positions = sorted(item["_shard_position"] for item in successful)
+    # Anything not confirmed as sent counts as failed.
+    return successful_positions, sorted(set(range(len(queue))) - set(successful_positions))
+
+
+class ShardedSender:
+    """
+    Sends a queue through several sender processes at once, each with its
+    own browser profile (and so its own WhatsApp session or account).
+
+    Items are sharded by group, so every group is served by exactly one
+    worker and keeps its order from the sorted queue. The workers' results
+    are merged back into one (successful, failed) pair in queue order.
+
+    The profiles are logged in to `accounts` different accounts (shard n
+    uses account n % accounts). Rate limits apply per account: the shards
+    of one account share a single RateLimiter, hosted in a manager process.
+    """
+
+    def __init__(
+        self,
+        backend_name: str,
+        profile_dirs: List[str],
+        ledger_path: str | Path | None = None,
+        log_level: str = "INFO",
+        accounts: int = 1,
+    ):
+        if not profile_dirs:
+            raise ValueError("ShardedSender needs at least one profile directory.")
+        if accounts < 1:
+            raise ValueError("ShardedSender needs at least one account.")
+        if asyncio.iscoroutinefunction(getattr(backend_factory(backend_name), "select_chat", None)):
+            raise ValueError("Sharded sending needs a synchronous backend (selenium or playwright).")
+        self.backend_name = backend_name
+        self.profile_dirs = profile_dirs
+        self.ledger_path = str(ledger_path) if ledger_path else None
+        self.log_level = log_level
+        self.accounts = min(accounts, len(profile_dirs))
+
+    def split(self, queue: List[Dict[str, Any]]) -> List[List[int]]:
+        """Returns, per shard, the positions of its items in `queue` (in queue order)."""
+        shards: List[List[int]] = [[] for _ in self.profile_dirs]
+        for position, item in enumerate(queue):
+            shards[shard_for_group(item["group_name"], len(self.profile_dirs))].append(position)
+        return shards
+
+    def send_queue(self, queue: List[Dict[str, Any]], interactive: bool = True):
+        """Sends the queue across the shards and returns (successful, failed) like WhatsAppFileSender."""
+        active = [(index, positions) for index, positions in enumerate(self.split(queue)) if positions]
+        logging.info(
+            f"Sending {len(queue)} item(s) with {len(active)} sender process(es): "
+            + ", ".join(f"shard {index}: {len(positions)}" for index, positions in active)
+        )
+
+        successful_positions, failed_positions = set(), set()
+        # Browser drivers do not survive fork(), so workers start from a fresh interpreter.
+        context = multiprocessing.get_context("spawn")
+        with _LimiterManager(ctx=context) as manager, \
+                ProcessPoolExecutor(max_workers=len(active) or 1, mp_context=context) as executor:
+            limiters = [
+                manager.RateLimiter(
+                    rate_per_minute=RATE_LIMIT_PER_MINUTE,
+                    burst=RATE_LIMIT_BURST,
+                    group_rate_per_minute=GROUP_RATE_LIMIT_PER_MINUTE,
+                    group_burst=GROUP_RATE_LIMIT_BURST,
+                )
+                for _ in range(self.accounts)
+            ]
+            futures = {
+                executor.submit(
+                    _send_shard,
+                    index,
+                    self.backend_name,
+                    self.profile_dirs[index],
+                    [queue[position] for position in positions],
+                    self.ledger_path,
+                    interactive,
+                    self.log_level,
+                    str(metrics.path) if metrics.path else None,
+                    limiters[index % self.accounts],
+                ): positions
+                for index, positions in active
+            }
+            for future, positions in futures.items():
+                try:
+                    shard_successful, shard_failed = future.result()
+                except Exception as e:
+                    logging.critical(f"A sender process crashed: {e}")
+                    shard_successful, shard_failed = [], range(len(positions))
+                successful_positions.update(positions[i] for i in shard_successful)
+                failed_positions.update(positions[i] for i in shard_failed)
+
+        successful = [item for position, item in enumerate(queue) if position in successful_positions]
+        failed = [item for position, item in enumerate(queue) if position in failed_positions]
+        return successful, failed
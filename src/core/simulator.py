@@ -0,0 +1,296 @@
+import io
+import math
+import random
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List
+
+from src.core.history import format_duration
+from src.core.rate_limiter import RateLimiter
+from src.core.scheduling import DEFAULT_UPLOAD_BYTES_PER_SECOND
+from src.core.sender import WhatsAppFileSender
+from src.core.sorter import FileSorter, GROUPED
+from config import (
+    DEFAULT_STAGGER_MINUTES,
+    MAX_FILES_PER_UPLOAD,
+    RATE_LIMIT_BURST,
+    GROUP_RATE_LIMIT_PER_MINUTE,
+    GROUP_RATE_LIMIT_BURST,
+)
+
+
+class VirtualClock:
+    """A clock that only moves when something sleeps on it, so simulated waits take no real time."""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += max(0.0, seconds)
+
+
+@dataclass(frozen=True)
+class Latency:
+    """
+    A latency distribution in seconds: 'fixed' (always `a`), 'uniform'
+    (between `a` and `b`) or 'lognormal' (median `a`, shape `b`).
+    """
+
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    def __post_init__(self):
+        if self.kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution '{self.kind}'. Options: fixed, uniform, lognormal")
+
+    @classmethod
+    def parse(cls, text: str) -> "Latency":
+        """Parses '2' (fixed), 'uniform:1,3' or 'lognormal:2,0.5'."""
+        kind, _, params = text.partition(":") if ":" in text else ("fixed", "", text)
+        try:
+            values = [float(value) for value in params.split(",")]
+        except ValueError:
+            raise ValueError(f"Invalid latency '{text}'. Examples: 2, uniform:1,3, lognormal:2,0.5")
+        return cls(kind, *values[:2])
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(self.a), self.b)
+        return self.a
+
+
+@dataclass(frozen=True)
+class SimulatedLatencies:
+    """How long the simulated WhatsApp Web takes for each operation."""
+
+    # Searching for and opening a chat.
+    select_chat: Latency = Latency("lognormal", 3.0, 0.3)
+    # Issuing one upload action (attach, preview, send), plus a little per attached file.
+    attach: Latency = Latency("uniform", 1.0, 2.0)
+    per_file: Latency = Latency("fixed", 0.3)
+    # Server-side time before an upload's bytes start to count.
+    upload_overhead: Latency = Latency("uniform", 0.5, 1.5)
+    bytes_per_second: float = DEFAULT_UPLOAD_BYTES_PER_SECOND
+    select_failure_rate: float = 0.0
+    send_failure_rate: float = 0.0
+
+
+class SimulatedBackend:
+    """
+    A SenderBackend that drives no browser: every operation advances a
+    VirtualClock by a sampled latency. Uploads finish in the background,
+    one after another, and show up through pending_uploads() like WhatsApp
+    Web's clock indicators, so the sender's UploadTracker works as usual.
+    """
+
+    def __init__(
+        self,
+        clock: VirtualClock,
+        latencies: SimulatedLatencies,
+        rng: random.Random,
+        file_sizes: Dict[Path, int],
+    ):
+        self.clock = clock
+        self.latencies = latencies
+        self.rng = rng
+        self.file_sizes = file_sizes
+        self.chat_switches = 0
+        # Completion times of the files still uploading, oldest first.
+        self._completions: List[float] = []
+
+    def initialize_browser(self, interactive: bool = True):
+        pass
+
+    def shutdown_browser(self):
+        pass
+
+    def is_alive(self) -> bool:
+        return True
+
+    def select_chat(self, group_name: str) -> bool:
+        self.chat_switches += 1
+        self.clock.sleep(self.latencies.select_chat.sample(self.rng))
+        return self.rng.random() >= self.latencies.select_failure_rate
+
+    def attach_and_send_file(self, file_path: Path) -> bool:
+        return self.attach_and_send_files([file_path])
+
+    def attach_and_send_files(self, file_paths: List[Path]) -> bool:
+        latencies = self.latencies
+        self.clock.sleep(
+            latencies.attach.sample(self.rng) + sum(latencies.per_file.sample(self.rng) for _ in file_paths)
+        )
+        if self.rng.random() < latencies.send_failure_rate:
+            # Like the real backends, a failed send resets the page, cancelling uploads in progress.
+            self._completions.clear()
+            return False
+        # Uploads share one connection, so this one starts when the previous one is done.
+        finish = max([self.clock()] + self._completions[-1:]) + latencies.upload_overhead.sample(self.rng)
+        for path in file_paths:
+            finish += self.file_sizes.get(path, 0) / latencies.bytes_per_second
+            self._completions.append(finish)
+        return True
+
+    def pending_uploads(self) -> int:
+        now = self.clock()
+        self._completions = [finish for finish in self._completions if finish > now]
+        return len(self._completions)
+
+    def wait_for_uploads(self, timeout: float) -> bool:
+        if not self._completions:
+            return True
+        remaining = self._completions[-1] - self.clock()
+        if remaining > timeout:
+            self.clock.sleep(timeout)
+            return False
+        self.clock.sleep(remaining)
+        self._completions.clear()
+        return True
+
+
+@dataclass(frozen=True)
+class Policy:
+    """One sending configuration to simulate (a stagger of 0 means no global rate limit)."""
+
+    stagger_minutes: float = DEFAULT_STAGGER_MINUTES or 0.0
+    schedule: str = GROUPED
+    max_files_per_upload: int = MAX_FILES_PER_UPLOAD
+
+
+@dataclass
+class SimulationResult:
+    policy: Policy
+    makespan: float
+    chat_switches: int
+    sent: int
+    failed: int
+    # group -> seconds from the start until each of its files was confirmed
+    group_finish_times: Dict[str, List[float]] = field(default_factory=dict)
+
+    def group_latency(self) -> Dict[str, Dict[str, float]]:
+        """Per group: the mean and the last confirmation time of its files."""
+        return {
+            group: {"mean": sum(times) / len(times), "last": max(times)}
+            for group, times in self.group_finish_times.items()
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stagger_minutes": self.policy.stagger_minutes,
+            "schedule": self.policy.schedule,
+            "max_files_per_upload": self.policy.max_files_per_upload,
+            "makespan": self.makespan,
+            "chat_switches": self.chat_switches,
+            "sent": self.sent,
+            "failed": self.failed,
+            "group_latency": self.group_latency(),
+        }
+
+
+def simulate(
+    queue: List[Dict[str, Any]],
+    policy: Policy,
+    latencies: SimulatedLatencies | None = None,
+    seed: int = 0,
+) -> SimulationResult:
+    """
+    Sends a queue through the real scheduling, rate-limiting and send_queue
+    logic against a SimulatedBackend and a virtual clock. The same seed
+    gives every policy the same random latencies to start from.
+    """
+    latencies = latencies or SimulatedLatencies()
+    clock = VirtualClock()
+    rng = random.Random(seed)
+    queue = [dict(item) for item in queue]
+
+    options = {"batch_size": policy.max_files_per_upload} if policy.schedule == "round-robin" else {}
+    ordered = FileSorter().sort(queue, policy.schedule, **options)
+    file_sizes = {item.get("upload_path", item["file_path"]): item.get("file_size", 0) for item in ordered}
+
+    backend = SimulatedBackend(clock, latencies, rng, file_sizes)
+    rate_limiter = RateLimiter(
+        rate_per_minute=1 / policy.stagger_minutes if policy.stagger_minutes else None,
+        burst=RATE_LIMIT_BURST,
+        group_rate_per_minute=GROUP_RATE_LIMIT_PER_MINUTE,
+        group_burst=GROUP_RATE_LIMIT_BURST,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    sender = WhatsAppFileSender(
+        backend=backend,
+        rate_limiter=rate_limiter,
+        clock=clock,
+        sleep=clock.sleep,
+        max_files_per_upload=policy.max_files_per_upload,
+    )
+
+    group_finish_times: Dict[str, List[float]] = {}
+
+    def on_progress(progress: Dict[str, Any]):
+        if progress["sent"]:
+            group_finish_times.setdefault(progress["group_name"], []).extend([clock()] * len(progress["files"]))
+
+    # send_queue prints a separator per batch; keep the report readable.
+    with redirect_stdout(io.StringIO()):
+        successful, failed = sender.send_queue(ordered, on_progress=on_progress)
+
+    return SimulationResult(
+        policy=policy,
+        makespan=clock(),
+        chat_switches=backend.chat_switches,
+        sent=len(successful),
+        failed=len(failed),
+        group_finish_times=group_finish_times,
+    )
+
+
+def synthetic_queue(file_count: int, group_count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    A made-up queue: a few busy groups and many quiet ones (group k gets
+    files in proportion to 1/k), with log-normal file sizes around 300 KB.
+    """
+    rng = random.Random(seed)
+    groups = [f"group_{k:02d}" for k in range(1, group_count + 1)]
+    weights = [1 / k for k in range(1, group_count + 1)]
+    return [
+        {
+            "file_path": Path(f"report_{index:05d}.pdf"),
+            "group_name": rng.choices(groups, weights)[0],
+            "file_size": int(rng.lognormvariate(math.log(300_000), 1.0)),
+            "priority": 0,
+        }
+        for index in range(file_count)
+    ]
+
+
+def format_results(results: List[SimulationResult], per_group: bool = False) -> str:
+    """Formats simulation results as a table, fastest makespan first."""
+    lines = [
+        f"{'stagger':>8} {'schedule':<16} {'batch':>5} {'makespan':>9} {'switches':>8} "
+        f"{'sent':>6} {'failed':>6} {'mean latency':>12}  slowest group"
+    ]
+    for result in sorted(results, key=lambda r: r.makespan):
+        latency = result.group_latency()
+        all_times = [t for times in result.group_finish_times.values() for t in times]
+        mean = sum(all_times) / len(all_times) if all_times else 0.0
+        slowest = max(latency.items(), key=lambda entry: entry[1]["last"], default=None)
+        policy = result.policy
+        lines.append(
+            f"{policy.stagger_minutes:>8g} {policy.schedule:<16} {policy.max_files_per_upload:>5} "
+            f"{format_duration(result.makespan):>9} {result.chat_switches:>8} {result.sent:>6} {result.failed:>6} "
+            f"{format_duration(mean):>12}  "
+            + (f"{slowest[0]} ({format_duration(slowest[1]['last'])})" if slowest else "-")
+        )
+        if per_group:
+            for group, stats in sorted(latency.items(), key=lambda entry: entry[1]["last"]):
+                lines.append(
+                    f"{'':>8} {group:<40} mean {format_duration(stats['mean']):>8}, last {format_duration(stats['last']):>8}"
+                )
+    return "\n".join(lines)
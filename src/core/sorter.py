@@ -1,12 +1,22 @@
 from typing import List, Dict, Any
 import logging
 
+from src.core.scheduling import SchedulingStrategy, DispatchHeap, GroupedBySize, create_strategy
+
+# The default schedule: each chat visited once (see sort_by_group).
+GROUPED = GroupedBySize.name
+
 
 class FileSorter:
     """
     A dedicated service class responsible for sorting the dispatch queue.
     """
 
+    def __init__(self):
+        # Chat-switch counts of the last schedule: "scheduled" for the chosen
+        # order, "size_only" for plain smallest-first, for reporting.
+        self.last_switch_report: Dict[str, int] = {}
+
     def sort_by_size(
         self, hydrated_queue: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
@@ -25,3 +35,57 @@ class FileSorter:
         sorted_queue = sorted(hydrated_queue, key=lambda item: item.get("file_size", 0))
 
         return sorted_queue
+
+    def sort_by_group(
+        self, hydrated_queue: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Sorts a hydrated queue so each target chat is visited only once.
+
+        Items are grouped by 'group_name' and sorted by size inside each group.
+        Groups are ordered by their smallest file, so small files still go out
+        first across groups.
+        """
+        return self.schedule(hydrated_queue, GroupedBySize())
+
+    def schedule(
+        self, hydrated_queue: List[Dict[str, Any]], strategy: SchedulingStrategy
+    ) -> List[Dict[str, Any]]:
+        """
+        Orders a hydrated queue with a scheduling strategy (see
+        src/core/scheduling.py). Items are pushed smallest first, so ties
+        within a strategy's key go to the smaller file.
+        """
+        if not hydrated_queue:
+            return []
+
+        logging.info(f"Scheduling {len(hydrated_queue)} item(s) with the '{strategy.name}' strategy.")
+        size_sorted = sorted(hydrated_queue, key=lambda item: item.get("file_size", 0))
+        heap = DispatchHeap(strategy)
+        heap.extend(size_sorted)
+        sorted_queue = heap.drain()
+
+        self.last_switch_report = {
+            "size_only": self.count_chat_switches(size_sorted),
+            "scheduled": self.count_chat_switches(sorted_queue),
+        }
+        logging.info(
+            f"The '{strategy.name}' order needs {self.last_switch_report['scheduled']} chat switch(es) instead of "
+            f"{self.last_switch_report['size_only']} for the size-only order."
+        )
+        return sorted_queue
+
+    def sort(self, hydrated_queue: List[Dict[str, Any]], strategy_name: str = GROUPED, **options) -> List[Dict[str, Any]]:
+        """Sorts with the named scheduling strategy (see STRATEGIES)."""
+        return self.schedule(hydrated_queue, create_strategy(strategy_name, **options))
+
+    @staticmethod
+    def count_chat_switches(queue: List[Dict[str, Any]]) -> int:
+        """Counts how many times the sender must open a different chat for this order."""
+        switches = 0
+        current_group = None
+        for item in queue:
+            if item["group_name"] != current_group:
+                switches += 1
+                current_group = item["group_name"]
+        return switches
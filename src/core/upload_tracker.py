@@ -0,0 +1,172 @@
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+# How often settle() re-counts indicators when it cannot wait for all of them to go.
+POLL_INTERVAL_SECONDS = 1.0
+
+
+@dataclass
+class TrackedUpload:
+    """A batch whose send was issued, and what is known about its upload."""
+
+    batch: List[Dict[str, Any]]
+    sent_at: float
+    deadline: float
+    # Whatever the caller wants back with the result (timings, sizes...).
+    context: Dict[str, Any] = field(default_factory=dict)
+    # True once its pending (clock) indicator is known to have rendered.
+    seen: bool = False
+    # The time of the check that resolved it; uploads resolved by the same
+    # check share the same value.
+    resolved_at: float | None = None
+
+
+class UploadTracker:
+    """
+    Tracks uploads that have been sent but not yet confirmed, so the sender
+    can move on to the next item straight away.
+
+    Uploads finish in the order they were sent, so with P pending (clock)
+    indicators in the chat, every batch older than the newest P files is
+    done. Right after a send its indicator may not have rendered yet, so a
+    batch is only confirmed once its indicator is known to have rendered
+    (seen), or `grace` seconds after it was sent.
+    Indicators already shown before the first tracked send (e.g. a stuck
+    message) are not counted.
+
+    The tracker is polled cooperatively from the sending thread (poll() is
+    non-blocking, settle() waits), because the indicators can only be read
+    in the open chat: settle() must run before switching chats. Both return
+    the uploads they resolved as (upload, ok) pairs, oldest first, so the
+    caller handles results (and their errors) in its own code.
+    Backends without pending_uploads() confirm every batch immediately.
+    """
+
+    def __init__(
+        self,
+        backend,
+        timeout: float,
+        grace: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.backend = backend
+        self.timeout = timeout
+        self.grace = grace
+        self.clock = clock
+        self.sleep = sleep
+        self._outstanding: Deque[TrackedUpload] = deque()
+        # Pending indicators in the chat that are not from tracked uploads.
+        self._foreign_pending = 0
+
+    @property
+    def supported(self) -> bool:
+        return callable(getattr(self.backend, "pending_uploads", None))
+
+    def __len__(self) -> int:
+        return len(self._outstanding)
+
+    def track(self, batch: List[Dict[str, Any]], **context) -> List[Tuple[TrackedUpload, bool]]:
+        """
+        Starts tracking a batch whose send was just issued. Returns the
+        batch as confirmed straight away if the backend cannot report uploads.
+        """
+        now = self.clock()
+        upload = TrackedUpload(batch, now, now + self.timeout, context)
+        if not self.supported:
+            upload.resolved_at = now
+            return [(upload, True)]
+        self._outstanding.append(upload)
+        return []
+
+    def _pending_uploads(self) -> int:
+        """Private method to count the pending indicators of tracked uploads."""
+        pending = self.backend.pending_uploads()
+        if not self._outstanding:
+            self._foreign_pending = pending
+            return 0
+        self._foreign_pending = min(self._foreign_pending, pending)
+        return pending - self._foreign_pending
+
+    def _resolve(self, pending_files: int) -> List[Tuple[TrackedUpload, bool]]:
+        """Private method to confirm the uploads the pending count shows as done, and expire overdue ones."""
+        now = self.clock()
+        resolved = []
+
+        def rendered(upload: TrackedUpload) -> bool:
+            # Whether the upload shows an indicator for as long as it is still uploading.
+            return upload.seen or now >= upload.sent_at + self.grace
+
+        # Uploads past their grace period account for at most this many
+        # indicators; any beyond that belong to newer uploads, which render
+        # in the order they were sent.
+        unexplained = pending_files - sum(len(upload.batch) for upload in self._outstanding if rendered(upload))
+        for upload in self._outstanding:
+            if unexplained <= 0:
+                break
+            if not rendered(upload):
+                upload.seen = True
+                unexplained -= len(upload.batch)
+
+        # The oldest upload is done once the rendered uploads after it explain
+        # every pending indicator: were it still uploading, so would they be.
+        rendered_files = sum(len(upload.batch) for upload in self._outstanding if rendered(upload))
+        while self._outstanding and rendered(self._outstanding[0]):
+            oldest = self._outstanding[0]
+            if rendered_files - len(oldest.batch) < pending_files:
+                break
+            self._outstanding.popleft()
+            rendered_files -= len(oldest.batch)
+            oldest.resolved_at = now
+            resolved.append((oldest, True))
+
+        while self._outstanding and self._outstanding[0].deadline <= now:
+            resolved.append(self._fail_oldest("was not confirmed in time", now))
+        return resolved
+
+    def poll(self) -> List[Tuple[TrackedUpload, bool]]:
+        """Resolves the uploads that have finished, without waiting."""
+        if not self.supported:
+            return []
+        pending_files = self._pending_uploads()
+        return self._resolve(pending_files) if self._outstanding else []
+
+    def settle(self) -> List[Tuple[TrackedUpload, bool]]:
+        """Waits until every tracked upload has finished or timed out."""
+        resolved = []
+        while self._outstanding:
+            newest = self._outstanding[-1]
+            remaining = newest.deadline - self.clock()
+            if remaining <= 0:
+                resolved += self._resolve(self._pending_uploads())
+                # Whatever is still pending now has run out of time.
+                while self._outstanding:
+                    resolved.append(self._fail_oldest("was not confirmed in time", self.clock()))
+                break
+            if self._foreign_pending:
+                # Indicators not from tracked uploads may never go away: count instead.
+                self.sleep(min(remaining, POLL_INTERVAL_SECONDS))
+            elif self.backend.wait_for_uploads(remaining) and not newest.seen:
+                # The newest indicator may not have rendered yet: give it time.
+                self.sleep(max(0.0, newest.sent_at + self.grace - self.clock()))
+            resolved += self._resolve(self._pending_uploads())
+        return resolved
+
+    def abandon(self) -> List[Tuple[TrackedUpload, bool]]:
+        """
+        Fails every outstanding upload without waiting. Used after the page
+        was reset (e.g. a failed send reloads WhatsApp Web), which cancels
+        uploads still in progress, so their indicators can no longer be trusted.
+        """
+        now = self.clock()
+        return [self._fail_oldest("may have been cancelled by a page reset", now) for _ in range(len(self._outstanding))]
+
+    def _fail_oldest(self, reason: str, now: float) -> Tuple[TrackedUpload, bool]:
+        """Private method to resolve the oldest outstanding upload as failed."""
+        upload = self._outstanding.popleft()
+        upload.resolved_at = now
+        logging.error(f"Upload of {len(upload.batch)} file(s) to '{upload.batch[0]['group_name']}' {reason}.")
+        return upload, False
@@ -0,0 +1,198 @@
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from src.core.dispatcher import DispatcherController
+from src.core.file_record import FileRecord
+from src.core.sender import WhatsAppFileSender
+from src.core.scheduling import DispatchHeap, GroupedBySize, SchedulingStrategy
+
+try:  # Optional: native change notifications (inotify on Linux).
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+
+class _PdfEventHandler(FileSystemEventHandler):
+    """Forwards created/modified/moved-in PDF paths to the watcher."""
+
+    def __init__(self, notify):
+        self.notify = notify
+
+    def on_any_event(self, event):
+        if event.is_directory or event.event_type not in ("created", "modified", "moved", "closed"):
+            return
+        path = getattr(event, "dest_path", None) or event.src_path
+        if str(path).lower().endswith(".pdf"):
+            self.notify(Path(path))
+
+
+class FolderWatcher:
+    """
+    Watches workspace folders for new PDFs and streams them into a
+    long-lived WhatsAppFileSender.
+
+    - New files are picked up from inotify (via the optional `watchdog`
+      package), or by polling the folders when it is not installed.
+    - A file is only queued once its size and mtime have not changed for
+      `settle_seconds`, so half-copied files are never sent.
+    - Files that settle within `coalesce_seconds` of each other are routed
+      together and pushed onto one long-lived DispatchHeap ordered by
+      `strategy` (by default each chat visited once, smallest first).
+    - The heap is sent one chat run at a time, so files settling while a
+      backlog is being sent are scheduled among the items still waiting.
+    """
+
+    def __init__(
+        self,
+        folders: List[Path],
+        dispatcher: DispatcherController,
+        sender: WhatsAppFileSender,
+        settle_seconds: float = 5,
+        coalesce_seconds: float = 30,
+        poll_seconds: float = 2,
+        optimizer=None,
+        strategy: SchedulingStrategy | None = None,
+    ):
+        self.folders = [Path(f) for f in folders]
+        self.dispatcher = dispatcher
+        self.sender = sender
+        self.settle_seconds = settle_seconds
+        self.coalesce_seconds = coalesce_seconds
+        self.poll_seconds = poll_seconds
+        # Optional PdfOptimizer stage applied before sorting.
+        self.optimizer = optimizer
+        # Routed items waiting to be sent, in schedule order.
+        self._heap = DispatchHeap(strategy or GroupedBySize())
+
+        self._events: "queue.Queue[Path]" = queue.Queue()
+        # Files seen on the last poll: path -> (size, mtime_ns).
+        self._snapshot: Dict[Path, Tuple[int, int]] = {}
+        # Files waiting to settle: path -> ((size, mtime_ns), time of last change).
+        self._settling: Dict[Path, Tuple[Tuple[int, int], float]] = {}
+        self._window: List[FileRecord] = []
+        self._window_started: float | None = None
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        """Private method to list the PDFs in every watched folder with their size and mtime."""
+        found = {}
+        for folder in self.folders:
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if entry.name.lower().endswith(".pdf") and entry.is_file():
+                            stat_result = entry.stat()
+                            found[Path(entry.path)] = (stat_result.st_size, stat_result.st_mtime_ns)
+            except OSError as e:
+                logging.warning(f"Could not scan watched folder '{folder}': {e}")
+        return found
+
+    def _poll_for_changes(self):
+        """Private method used when watchdog is unavailable: diff the folders against the last scan."""
+        current = self._scan()
+        for path, signature in current.items():
+            if self._snapshot.get(path) != signature:
+                self._events.put(path)
+        self._snapshot = current
+
+    def _check_settling(self, now: float):
+        """Private method to move files whose size and mtime stopped changing into the window."""
+        while True:
+            try:
+                path = self._events.get_nowait()
+            except queue.Empty:
+                break
+            self._settling.setdefault(path, ((-1, -1), now))
+
+        for path, (last_signature, changed_at) in list(self._settling.items()):
+            try:
+                record = FileRecord.from_path(path)
+            except FileNotFoundError:
+                del self._settling[path]
+                continue
+            signature = (record.size, record.mtime_ns)
+            if signature != last_signature:
+                self._settling[path] = (signature, now)
+            elif now - changed_at >= self.settle_seconds:
+                del self._settling[path]
+                logging.info(f"New file settled: '{record.name}' ({record.size} bytes).")
+                self._window.append(record)
+                if self._window_started is None:
+                    self._window_started = now
+
+    def _flush_window(self):
+        """Private method to route every file collected in the current window onto the heap."""
+        records, self._window, self._window_started = self._window, [], None
+        # Pick up edits to the rule CSV without restarting the browser.
+        self.dispatcher.rule_store.reload_if_changed()
+        queue_items, unmatched = self.dispatcher.get_queue_for_records(records)
+        for path in unmatched:
+            logging.info(f"No rule matches '{path.name}', ignoring it.")
+        if not queue_items:
+            return
+        if self.optimizer:
+            queue_items = self.optimizer.optimize_queue(queue_items)
+        self._heap.extend(queue_items)
+        print(f"\n--- Queued {len(queue_items)} item(s) from {len(records)} new file(s), {len(self._heap)} waiting ---")
+
+    def _send_next_run(self):
+        """Private method to send the next run of items for one chat from the heap."""
+        run = [self._heap.pop()]
+        while self._heap and self._heap.peek()["group_name"] == run[0]["group_name"]:
+            run.append(self._heap.pop())
+        successful, failed = self.sender.send_queue(run)
+        print(f"'{run[0]['group_name']}': ✅ {len(successful)} sent, ❌ {len(failed)} failed, {len(self._heap)} waiting.")
+        for item in failed:
+            print(f"  - '{item['file_path'].name}' to '{item['group_name']}'")
+
+    def run(self, stop_event: threading.Event | None = None):
+        """Watches until `stop_event` is set (or Ctrl+C). The sender must already be initialized."""
+        stop_event = stop_event or threading.Event()
+        self._snapshot = self._scan()  # Files already present are not new.
+
+        observer = None
+        if Observer is not None:
+            observer = Observer()
+            handler = _PdfEventHandler(self._events.put)
+            for folder in self.folders:
+                observer.schedule(handler, str(folder), recursive=False)
+            observer.start()
+            logging.info(f"Watching {len(self.folders)} folder(s) with native change notifications.")
+        else:
+            logging.info(f"Watching {len(self.folders)} folder(s) by polling every {self.poll_seconds}s.")
+        print(f"Watching {', '.join(str(f) for f in self.folders)} for new PDFs (Ctrl+C to stop)...")
+
+        try:
+            while not stop_event.is_set():
+                if observer is None:
+                    self._poll_for_changes()
+                now = time.monotonic()
+                self._check_settling(now)
+                if self._window and now - self._window_started >= self.coalesce_seconds:
+                    self._flush_window()
+                if self._heap:
+                    # Check for new files between chat runs, so they join the backlog.
+                    self._send_next_run()
+                    continue
+                # Poll fast enough to notice settling files, but never busy-loop.
+                stop_event.wait(min(self.poll_seconds, self.settle_seconds / 2 or self.poll_seconds))
+            # Stopped gracefully: send what has already settled.
+            if self._window:
+                self._flush_window()
+            while self._heap:
+                self._send_next_run()
+        except KeyboardInterrupt:
+            logging.info(
+                f"Watch mode interrupted with {len(self._heap)} item(s) waiting; "
+                "files not yet sent can be sent with a regular run."
+            )
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
@@ -1,11 +1,63 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+from pathlib import Path
 
-def setup_logging():
-    """Sets up logging to a file for the application run."""
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.FileHandler("whatsapp_distributor.log"),
-        ]
-    )
\ No newline at end of file
+from config import LOG_FILE, LOG_LEVEL, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_JSON
+
+# The background writer started by setup_logging (None until then).
+_listener: logging.handlers.QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def setup_logging(level: str | int = LOG_LEVEL, json_output: bool = LOG_JSON, log_file: str | Path = LOG_FILE):
+    """
+    Sets up logging to a size-rotated file for the application run.
+    Callers only put records on an in-memory queue; a background
+    QueueListener thread formats and writes them, so a slow disk never
+    stalls a send. Debug records are dropped before any formatting
+    unless `level` is DEBUG.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+    )
+    file_handler.setFormatter(
+        JsonFormatter() if json_output else logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    )
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Flushes queued records to the log file and stops the background writer."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
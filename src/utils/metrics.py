@@ -0,0 +1,181 @@
+import asyncio
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, List
+
+# The group being worked on, so backend spans can be attributed to it
+# without passing the name through every method.
+_current_group: ContextVar[str | None] = ContextVar("metrics_current_group", default=None)
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """Linear-interpolated percentile of an already sorted, non-empty list."""
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def _describe(durations: List[float]) -> Dict[str, float]:
+    """Count, total, p50 and p95 (seconds) of a list of durations."""
+    ordered = sorted(durations)
+    return {
+        "count": len(ordered),
+        "total": sum(ordered),
+        "p50": _percentile(ordered, 0.50),
+        "p95": _percentile(ordered, 0.95),
+    }
+
+
+class MetricsRecorder:
+    """
+    Collects timing spans for each phase of a run.
+
+    Every finished span is appended as one JSON line to the metrics file (if
+    one is open) and kept in memory for the end-of-run p50/p95 summary per
+    phase and per group. Safe to use from several threads.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._file = None
+        self.path: Path | None = None
+        # phase -> durations, and group -> phase -> durations
+        self._by_phase: Dict[str, List[float]] = {}
+        self._by_group: Dict[str, Dict[str, List[float]]] = {}
+
+    def open(self, path: str | Path):
+        """Starts writing spans to a JSON-lines file at `path`."""
+        self.close()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def record(self, phase: str, duration: float, group: str | None = None, **fields: Any):
+        """Records one finished span of `duration` seconds."""
+        group = group if group is not None else _current_group.get()
+        with self._lock:
+            self._by_phase.setdefault(phase, []).append(duration)
+            if group is not None:
+                self._by_group.setdefault(group, {}).setdefault(phase, []).append(duration)
+            if self._file:
+                line = {"ts": time.time(), "phase": phase, "group": group, "duration": round(duration, 6), **fields}
+                self._file.write(json.dumps(line, default=str) + "\n")
+                self._file.flush()
+
+    @contextmanager
+    def span(self, phase: str, group: str | None = None, **fields: Any):
+        """
+        Times the enclosed block as `phase`. The span is recorded with
+        ok=False (and re-raised) if the block raises.
+        """
+        start = self.clock()
+        ok = True
+        try:
+            yield fields
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            self.record(phase, self.clock() - start, group=group, ok=ok, **fields)
+
+    @contextmanager
+    def group_scope(self, group: str | None):
+        """Attributes spans recorded inside the block (on this thread or task) to `group`."""
+        token = _current_group.set(group)
+        try:
+            yield
+        finally:
+            _current_group.reset(token)
+
+    def summary(self) -> Dict[str, Any]:
+        """Returns {'phases': {phase: stats}, 'groups': {group: {phase: stats}}}."""
+        with self._lock:
+            return {
+                "phases": {phase: _describe(d) for phase, d in self._by_phase.items()},
+                "groups": {
+                    group: {phase: _describe(d) for phase, d in phases.items()}
+                    for group, phases in self._by_group.items()
+                },
+            }
+
+    def format_summary(self) -> str:
+        """Formats the summary as a plain-text table."""
+        summary = self.summary()
+        if not summary["phases"]:
+            return "No timings were recorded."
+        lines = [f"{'phase':<36}{'count':>7}{'p50 s':>9}{'p95 s':>9}{'total s':>10}"]
+
+        def add_rows(phases: Dict[str, Dict[str, float]], indent: str = ""):
+            for phase, stats in sorted(phases.items()):
+                lines.append(
+                    f"{indent + phase:<36}{stats['count']:>7}{stats['p50']:>9.2f}"
+                    f"{stats['p95']:>9.2f}{stats['total']:>10.2f}"
+                )
+
+        add_rows(summary["phases"])
+        for group, phases in sorted(summary["groups"].items()):
+            lines.append(f"[{group}]")
+            add_rows(phases, indent="  ")
+        return "\n".join(lines)
+
+
+# The recorder shared by the sender facade and the backends.
+metrics = MetricsRecorder()
+
+
+def timed(phase: str):
+    """
+    Decorator that records every call of a (sync or async) function as a span.
+    A `group_name` argument, if the function takes one, names the span's group.
+    """
+
+    def decorator(func):
+        def group_of(args, kwargs):
+            if "group_name" in kwargs:
+                return kwargs["group_name"]
+            # Methods of the form method(self, group_name, ...).
+            if func.__code__.co_varnames[1:2] == ("group_name",) and len(args) > 1:
+                return args[1]
+            return None
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with metrics.span(phase, group=group_of(args, kwargs)):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with metrics.span(phase, group=group_of(args, kwargs)):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def log_summary():
+    """Logs and prints the end-of-run timing summary, then closes the metrics file."""
+    text = metrics.format_summary()
+    logging.info(f"Timing summary:\n{text}")
+    print("\n--- Timing Summary ---")
+    print(text)
+    if metrics.path:
+        print(f"(Per-span timings: {metrics.path})")
+    metrics.close()